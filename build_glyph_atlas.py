@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Glyph Atlas Builder
+Builds the glyph atlas used by the fast OCR path from labelled recordings.
+
+Takes the same input as run_benchmark.py: a directory of screenshots (or a
+video) and a JSON object mapping frame file names (or frame numbers) to the
+event name shown in that frame. The event title is cut out of every
+labelled frame, binarized, split into glyphs and paired with the label's
+characters; frames whose glyphs can't be paired one-to-one are skipped.
+"""
+
+import argparse
+import json
+import sys
+import os
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core.glyph_ocr import GLYPH_ATLAS_PATH, GlyphAtlas
+from core.layout import Layout
+from core.pipeline import EVENT_REGION
+from core.preprocess import THRESHOLD_METHODS, Preprocessor
+from core.replay import iter_frames
+
+
+def labelled_titles(source, labels, preprocessor, crops):
+    """Yield (binary title crop, label) for every labelled frame with an event."""
+    for frame_id, image in iter_frames(source):
+        title = labels.get(frame_id)
+        if not title:
+            continue
+        if not crops:
+            x, y, width, height = Layout(image.shape[1], image.shape[0]).region(EVENT_REGION)
+            image = image[y:y + height, x:x + width]
+        # The preprocessor reuses its buffers, so keep a copy of each crop
+        yield preprocessor(image).copy(), title
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the glyph atlas for the fast OCR path.")
+    parser.add_argument("source", help="directory of frames or a video file")
+    parser.add_argument("--labels", required=True, help="JSON file mapping frame ids to the event name shown")
+    parser.add_argument("--output", default=GLYPH_ATLAS_PATH, help=f"atlas file to write (default {GLYPH_ATLAS_PATH})")
+    parser.add_argument("--crops", action="store_true", help="the images are already event title crops, not full frames")
+    parser.add_argument("--threshold", choices=THRESHOLD_METHODS, default="otsu", help="event title binarization (default otsu)")
+    parser.add_argument("--upscale", type=int, default=1, help="integer factor to enlarge the event title before OCR")
+    args = parser.parse_args()
+
+    with open(args.labels, "r", encoding="utf-8") as f:
+        labels = json.load(f)
+
+    preprocessor = Preprocessor(threshold=args.threshold, upscale=args.upscale)
+    atlas, used, skipped = GlyphAtlas.build(labelled_titles(args.source, labels, preprocessor, args.crops))
+    if not used:
+        print("❌ No labelled title could be split into its characters, nothing written")
+        return 1
+
+    atlas.save(args.output)
+    print(f"✅ Wrote {len(atlas)} glyphs from {used} titles to {args.output} ({skipped} titles skipped)")
+    print(f"   Characters: {''.join(atlas.characters)}")
+    print(f"   Word break: gaps over {atlas.space_ratio:.2f} of the crop height")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
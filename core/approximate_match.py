@@ -0,0 +1,196 @@
+"""Bounded, OCR-aware approximate string matching.
+
+Instead of expanding an OCR read into every plausible spelling, a single
+query is compared against the known names with a weighted edit distance in
+which common OCR confusions (l/!, ☆/%, 0/O, rn/m, ...) are cheap. Candidates
+are pre-filtered with a trigram count filter over confusion-folded names so
+only a few names ever reach the edit distance computation.
+"""
+
+import math
+
+INDEL_COST = 1.0
+SUBSTITUTION_COST = 1.0
+CONFUSION_COST = 0.3
+
+# OCR confusions, applied in both directions
+OCR_CONFUSIONS = {
+    ('l', '!'): CONFUSION_COST,
+    ('i', '!'): CONFUSION_COST,
+    ('l', 'i'): CONFUSION_COST,
+    ('l', '1'): CONFUSION_COST,
+    ('i', '1'): CONFUSION_COST,
+    ('l', '|'): CONFUSION_COST,
+    ('☆', '%'): CONFUSION_COST,
+    ('0', 'o'): CONFUSION_COST,
+    ('5', 's'): CONFUSION_COST,
+    ('rn', 'm'): CONFUSION_COST,
+    ('vv', 'w'): CONFUSION_COST,
+    ('cl', 'd'): CONFUSION_COST,
+}
+
+# Confusion classes collapsed to one representative for candidate filtering
+FOLD_SEQUENCES = [('rn', 'm'), ('vv', 'w'), ('cl', 'd')]
+FOLD_CHARACTERS = str.maketrans({'!': 'l', 'i': 'l', '1': 'l', '|': 'l', '%': '☆', '0': 'o', '5': 's'})
+
+_CHAR_COSTS = {}
+_SEQUENCE_COSTS = []
+for (_a, _b), _cost in OCR_CONFUSIONS.items():
+    for _x, _y in ((_a, _b), (_b, _a)):
+        if len(_x) == 1 and len(_y) == 1:
+            _CHAR_COSTS[(_x, _y)] = _cost
+        else:
+            _SEQUENCE_COSTS.append((_x, _y, _cost))
+_MAX_SEQUENCE = max([len(x) for x, _, _ in _SEQUENCE_COSTS] + [1])
+_MIN_LENGTH_COST = min([INDEL_COST] + [cost for x, y, cost in _SEQUENCE_COSTS if len(x) != len(y)])
+
+
+def fold_confusions(text):
+    """Collapse OCR-confusable characters so confused strings fold together."""
+    for sequence, replacement in FOLD_SEQUENCES:
+        text = text.replace(sequence, replacement)
+    return text.translate(FOLD_CHARACTERS)
+
+
+def default_max_distance(query):
+    """Edit budget used when the caller doesn't give one."""
+    return max(1.0, len(query) * 0.15)
+
+
+def weighted_edit_distance(a, b, max_distance=math.inf):
+    """Edit distance with cheap OCR confusions.
+
+    Returns ``math.inf`` as soon as the distance is known to exceed
+    ``max_distance``. Multi-character confusions reach back more than one
+    row, so a single row over budget doesn't rule the pair out yet:
+
+    >>> weighted_edit_distance("rn", "m", 0.5)
+    0.3
+    """
+    len_a, len_b = len(a), len(b)
+    if abs(len_a - len_b) * _MIN_LENGTH_COST > max_distance:
+        return math.inf
+
+    rows = [[j * INDEL_COST for j in range(len_b + 1)]]
+    for i in range(1, len_a + 1):
+        prev = rows[-1]
+        cur = [i * INDEL_COST] + [0.0] * len_b
+        char_a = a[i - 1]
+        for j in range(1, len_b + 1):
+            char_b = b[j - 1]
+            if char_a == char_b:
+                best = prev[j - 1]
+            else:
+                best = prev[j - 1] + _CHAR_COSTS.get((char_a, char_b), SUBSTITUTION_COST)
+                deletion = prev[j] + INDEL_COST
+                if deletion < best:
+                    best = deletion
+                insertion = cur[j - 1] + INDEL_COST
+                if insertion < best:
+                    best = insertion
+                for x, y, cost in _SEQUENCE_COSTS:
+                    len_x, len_y = len(x), len(y)
+                    if len_x <= i and len_y <= j and a.endswith(x, 0, i) and b.endswith(y, 0, j):
+                        candidate = rows[-len_x][j - len_y] + cost
+                        if candidate < best:
+                            best = candidate
+            cur[j] = best
+        rows.append(cur)
+        if len(rows) > _MAX_SEQUENCE:
+            rows.pop(0)
+        # Later rows build on any of the rows kept, so prune only once all of them are over budget
+        if min(min(row) for row in rows) > max_distance:
+            return math.inf
+
+    distance = rows[-1][len_b]
+    return distance if distance <= max_distance else math.inf
+
+
+def _padded_trigrams(text):
+    padded = f"$${text}$$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class ApproximateMatcher:
+    """Ranks known names by weighted edit distance to an OCR query."""
+
+    def __init__(self, names):
+        self.names = []
+        self.trigram_index = {}
+        self.length_index = {}
+        for name in names:
+            self.add(name)
+
+    def to_data(self):
+        """The name list and filter indexes as plain lists, for the JSON database cache."""
+        return {"names": self.names, "trigram_index": self.trigram_index,
+                "length_index": {str(length): name_ids for length, name_ids in self.length_index.items()}}
+
+    @classmethod
+    def from_data(cls, data):
+        matcher = cls(())
+        matcher.names = list(data["names"])
+        matcher.trigram_index = data["trigram_index"]
+        matcher.length_index = {int(length): name_ids for length, name_ids in data["length_index"].items()}
+        return matcher
+
+    def add(self, name):
+        """Index one more name and return its id."""
+        name_id = len(self.names)
+        self.names.append(name)
+        folded = fold_confusions(name)
+        self.length_index.setdefault(len(folded), []).append(name_id)
+        for trigram in _padded_trigrams(folded):
+            self.trigram_index.setdefault(trigram, []).append(name_id)
+        return name_id
+
+    def remove(self, name_id):
+        """Stop returning a name; its id is not reused."""
+        folded = fold_confusions(self.names[name_id])
+        self.length_index[len(folded)].remove(name_id)
+        for trigram in _padded_trigrams(folded):
+            self.trigram_index[trigram].remove(name_id)
+
+    def candidates(self, query, max_edits):
+        """Names sharing enough folded trigrams to be within ``max_edits`` edits."""
+        folded = fold_confusions(query)
+        trigrams = _padded_trigrams(folded)
+        # Each edit destroys at most three of the query's trigrams
+        required = len(trigrams) - 3 * max_edits
+        if required <= 0:
+            candidates = []
+            for length in range(len(folded) - max_edits, len(folded) + max_edits + 1):
+                candidates.extend(self.length_index.get(length, ()))
+            return candidates
+
+        counts = {}
+        for trigram in trigrams:
+            for name_id in self.trigram_index.get(trigram, ()):
+                counts[name_id] = counts.get(name_id, 0) + 1
+        return [name_id for name_id, count in counts.items() if count >= required]
+
+    def search(self, query, max_distance=None, limit=None):
+        """Return ``(name_id, distance, score)`` tuples, best first.
+
+        Score is ``1 - distance / length`` of the longer string, so an exact
+        match scores 1.0.
+        """
+        if not query:
+            return []
+        if max_distance is None:
+            max_distance = default_max_distance(query)
+
+        # Confusions fold away, so only full-cost edits count against the filter
+        max_edits = int(max_distance / min(INDEL_COST, SUBSTITUTION_COST))
+        results = []
+        for name_id in self.candidates(query, max_edits):
+            name = self.names[name_id]
+            distance = weighted_edit_distance(query, name, max_distance)
+            if distance != math.inf:
+                score = 1.0 - distance / max(len(query), len(name))
+                results.append((name_id, distance, score))
+
+        results.sort(key=lambda result: (result[1], -result[2], result[0]))
+        if limit is not None:
+            results = results[:limit]
+        return results
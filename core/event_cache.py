@@ -0,0 +1,78 @@
+"""Compiled cache for the event databases.
+
+Parsing the JSON databases and building the search index dominates startup,
+so the built index is saved next to the sources and read back on the next
+launch. The cache is plain JSON data, never code or pickled objects, since
+it sits in the folder users overwrite with database updates. Its first line
+holds the format version and each source's mtime, size and content hash,
+and is checked before the rest of the file is parsed; the cache is rebuilt
+as soon as any source changes.
+"""
+
+import hashlib
+import json
+import os
+
+# Bump whenever the cached payload or EventIndex layout changes
+CACHE_VERSION = 8
+
+
+def file_digest(path):
+    """Return the SHA-1 hex digest of a file's contents."""
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def source_signature(path):
+    """Describe a source file so cache staleness can be detected."""
+    if not os.path.exists(path):
+        return None
+    stat = os.stat(path)
+    return {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "sha1": file_digest(path)}
+
+
+def _is_fresh(path, signature):
+    if signature is None or not os.path.exists(path):
+        return signature is None and not os.path.exists(path)
+    stat = os.stat(path)
+    if stat.st_mtime_ns == signature["mtime_ns"] and stat.st_size == signature["size"]:
+        return True
+    # Touched but possibly unchanged (e.g. a fresh checkout), fall back to the content hash
+    return stat.st_size == signature["size"] and file_digest(path) == signature["sha1"]
+
+
+def load_event_cache(cache_path, source_paths):
+    """Load the cached payload, or return None if it is missing or stale."""
+    if not os.path.exists(cache_path):
+        return None
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            header = json.loads(f.readline())
+            if not isinstance(header, dict) or header.get("version") != CACHE_VERSION:
+                return None
+            sources = header.get("sources", {})
+            if set(sources) != set(source_paths):
+                return None
+            for path in source_paths:
+                if not _is_fresh(path, sources[path]):
+                    return None
+            return json.loads(f.readline())
+    except (OSError, ValueError) as e:
+        print(f"[WARNING] Ignoring unreadable event cache: {e}")
+        return None
+
+
+def save_event_cache(cache_path, source_paths, payload):
+    """Write the payload (plain JSON data) after the signatures of its sources."""
+    header = {
+        "version": CACHE_VERSION,
+        "sources": {path: source_signature(path) for path in source_paths},
+    }
+    tmp_path = cache_path + ".tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps(header) + "\n")
+            f.write(json.dumps(payload, ensure_ascii=False, separators=(",", ":")) + "\n")
+        os.replace(tmp_path, cache_path)
+    except (OSError, TypeError, ValueError) as e:
+        print(f"[WARNING] Could not write event cache: {e}")
@@ -0,0 +1,250 @@
+"""Event databases and a Tk-free lookup API over them.
+
+Used by the overlay, the offline tools and anything else (e.g. the
+auto-train bot) that needs to turn OCR strings into events.
+"""
+
+import hashlib
+import json
+import os
+import threading
+
+from core.event_cache import load_event_cache, save_event_cache
+from core.event_index import EventIndex
+from utils.file_watcher import FileWatcher
+
+SUPPORT_CARD_PATH = "assets/events/support_card.json"
+UMA_DATA_PATH = "assets/events/uma_data.json"
+URA_FINALE_PATH = "assets/events/ura_finale.json"
+EVENT_CACHE_PATH = "assets/events/events.cache"
+
+
+def _quiet(*args):
+    pass
+
+
+def read_support_events(path=SUPPORT_CARD_PATH):
+    with open(path, "r", encoding="utf-8-sig") as f:
+        return json.load(f)
+
+
+def read_uma_events(path=UMA_DATA_PATH):
+    uma_events = []
+    with open(path, "r", encoding="utf-8-sig") as f:
+        uma_data = json.load(f)
+        for character in uma_data:
+            if "UmaEvents" in character:
+                uma_events.extend(character["UmaEvents"])
+    return uma_events
+
+
+def read_ura_finale_events(path=URA_FINALE_PATH):
+    with open(path, "r", encoding="utf-8-sig") as f:
+        return json.load(f)
+
+
+SOURCE_READERS = {
+    SUPPORT_CARD_PATH: read_support_events,
+    UMA_DATA_PATH: read_uma_events,
+    URA_FINALE_PATH: read_ura_finale_events,
+}
+
+
+def read_source(path):
+    """Parse one database file into its list of events; a missing file has none."""
+    if not os.path.exists(path):
+        return []
+    return SOURCE_READERS[path](path)
+
+
+def event_digests(events):
+    """Fingerprint each raw event name's entries, so changes can be found without keeping the JSON."""
+    hashers = {}
+    for event in events:
+        hasher = hashers.get(event.get("EventName", ""))
+        if hasher is None:
+            hasher = hashers[event.get("EventName", "")] = hashlib.blake2b(digest_size=8)
+        hasher.update(json.dumps(event, sort_keys=True).encode("utf-8"))
+    return {event_name: hasher.digest() for event_name, hasher in hashers.items()}
+
+
+def changed_event_names(old_digests, new_digests):
+    """Raw event names whose entries differ between two versions of a database."""
+    return {name for name in old_digests.keys() | new_digests.keys()
+            if old_digests.get(name) != new_digests.get(name)}
+
+
+def _cache_payload(databases):
+    return {
+        "event_index": databases["event_index"].to_data(),
+        "source_digests": {path: {event_name: digest.hex() for event_name, digest in digests.items()}
+                           for path, digests in databases["source_digests"].items()},
+        "event_counts": databases["event_counts"],
+    }
+
+
+def _from_cache_payload(payload):
+    return {
+        "event_index": EventIndex.from_data(payload["event_index"]),
+        "source_digests": {path: {event_name: bytes.fromhex(digest) for event_name, digest in digests.items()}
+                           for path, digests in payload["source_digests"].items()},
+        "event_counts": payload["event_counts"],
+    }
+
+
+def load_event_databases(cache_path=EVENT_CACHE_PATH, verbose=True):
+    """Load the three event databases and their index, using the compiled cache when fresh.
+
+    The parsed JSON is dropped once indexed. Returns a dict with
+    ``event_index``, ``source_digests`` (see ``event_digests``, per source
+    path) and ``event_counts`` (entries per source path).
+    """
+    log = print if verbose else _quiet
+    log("Loading event databases...")
+    source_paths = list(SOURCE_READERS)
+    cached = None
+    if cache_path:
+        payload = load_event_cache(cache_path, source_paths)
+        try:
+            cached = _from_cache_payload(payload) if payload is not None else None
+        except (KeyError, TypeError, ValueError) as e:
+            print(f"[WARNING] Ignoring malformed event cache: {e}")
+    if cached is not None:
+        counts = cached["event_counts"]
+        log(f"   ✓ Loaded {counts[SUPPORT_CARD_PATH]} support card, {counts[UMA_DATA_PATH]} uma and "
+            f"{counts[URA_FINALE_PATH]} ura finale events from cache")
+        log("   ✓ Databases loaded successfully")
+        return cached
+
+    support_events = read_source(SUPPORT_CARD_PATH)
+    if support_events:
+        log(f"   ✓ Loaded {len(support_events)} support card events")
+    uma_events = read_source(UMA_DATA_PATH)
+    if uma_events:
+        log(f"   ✓ Loaded {len(uma_events)} uma events")
+    ura_finale_events = read_source(URA_FINALE_PATH)
+    if ura_finale_events:
+        log(f"   ✓ Loaded {len(ura_finale_events)} ura finale events")
+    event_index = EventIndex(support_events, uma_events, ura_finale_events)
+    log(f"   ✓ Indexed {len(event_index)} unique event names")
+    sources = dict(zip(source_paths, (support_events, uma_events, ura_finale_events)))
+    databases = {
+        "event_index": event_index,
+        "source_digests": {path: event_digests(events) for path, events in sources.items()},
+        "event_counts": {path: len(events) for path, events in sources.items()},
+    }
+    if cache_path:
+        save_event_cache(cache_path, source_paths, _cache_payload(databases))
+    log("   ✓ Databases loaded successfully")
+    return databases
+
+
+class EventDatabase:
+    """The loaded event databases plus a batch lookup API.
+
+    Only the compact index is kept in memory, not the parsed JSON. ``watch``
+    keeps it in sync with the files: changed files are reparsed on a
+    background thread and only the event names whose entries differ are
+    re-indexed.
+    """
+
+    def __init__(self, support_events=(), uma_events=(), ura_finale_events=(), event_index=None,
+                 cache_path=None, source_digests=None):
+        self.event_index = event_index or EventIndex(support_events, uma_events, ura_finale_events)
+        if source_digests is None:
+            source_digests = {path: event_digests(events) for path, events in
+                              zip(SOURCE_READERS, (support_events, uma_events, ura_finale_events))}
+        self.source_digests = source_digests
+        self.cache_path = cache_path
+        self.reload_lock = threading.Lock()
+        self.watcher = None
+
+    @classmethod
+    def load(cls, cache_path=EVENT_CACHE_PATH, verbose=True):
+        databases = load_event_databases(cache_path, verbose)
+        return cls(event_index=databases["event_index"], cache_path=cache_path,
+                   source_digests=databases["source_digests"])
+
+    def reload(self, paths=SOURCE_READERS):
+        """
+        Reparse the database files and update the index incrementally.
+
+        Args:
+            paths: The source files that changed (all of them by default).
+
+        Returns:
+            (added, removed, changed) event name counts. If any file can't be
+            parsed (e.g. a half-saved edit) nothing is updated.
+        """
+        with self.reload_lock:
+            # Unchanged files are read too: names shared across files are merged from all of them
+            try:
+                sources = {path: read_source(path) for path in SOURCE_READERS}
+            except (OSError, ValueError) as e:
+                print(f"[WARNING] Could not reload the event databases: {e}")
+                return 0, 0, 0
+
+            new_digests = dict(self.source_digests)
+            changed_names = set()
+            for path in paths:
+                new_digests[path] = event_digests(sources[path])
+                changed_names |= changed_event_names(self.source_digests[path], new_digests[path])
+            counts = self.event_index.update(changed_names, *sources.values())
+            self.source_digests = new_digests
+
+            if self.cache_path:
+                with self.event_index.lock:
+                    payload = _cache_payload({
+                        "event_index": self.event_index,
+                        "source_digests": new_digests,
+                        "event_counts": {path: len(events) for path, events in sources.items()},
+                    })
+                save_event_cache(self.cache_path, list(SOURCE_READERS), payload)
+            return counts
+
+    def watch(self, on_reload=None, interval=2.0):
+        """
+        Start reloading the databases whenever their JSON files change.
+
+        Args:
+            on_reload: Optional callback, run on the watcher thread after each
+                reload with the (added, removed, changed) counts.
+            interval: Seconds between file checks.
+        """
+        def reload_changed(paths):
+            counts = self.reload(paths)
+            print(f"🔄 Reloaded {', '.join(os.path.basename(path) for path in paths)}: "
+                  f"{counts[0]} added, {counts[1]} removed, {counts[2]} changed events")
+            if on_reload is not None:
+                on_reload(counts)
+
+        self.watcher = FileWatcher(list(SOURCE_READERS), reload_changed, interval)
+        self.watcher.start()
+
+    def stop_watching(self):
+        if self.watcher is not None:
+            self.watcher.stop()
+            self.watcher = None
+
+    def lookup(self, ocr_text, max_distance=None, limit=3):
+        """
+        Match one OCR string.
+
+        Returns a list of ``{"event", "source", "score", "options"}`` dicts,
+        best first; empty if nothing matched. ``options`` is a plain copy, safe
+        to modify or serialize.
+        """
+        found_events = self.event_index.find(ocr_text, max_distance, limit)
+        return [
+            {"event": event_name, "source": event_data["source"], "score": event_data["score"],
+             "options": dict(event_data["options"])}
+            for event_name, event_data in found_events.items()
+        ]
+
+    def lookup_batch(self, ocr_texts, max_distance=None, limit=3):
+        """Match many OCR strings; repeated strings are only searched once."""
+        results = {}
+        for ocr_text in ocr_texts:
+            if ocr_text not in results:
+                results[ocr_text] = self.lookup(ocr_text, max_distance, limit)
+        return [results[ocr_text] for ocr_text in ocr_texts]
@@ -0,0 +1,465 @@
+"""Precompiled lookup index over the event databases.
+
+The index is built once after the JSON databases are loaded. It normalizes
+every event name a single time and keeps hash and inverted indexes so a
+lookup only has to verify the handful of entries that can possibly match,
+instead of re-cleaning and comparing every event on each detection tick.
+
+The same title is read over and over while an event stays on screen, so
+normalized queries and the ranked results of ``find`` are also memoized,
+keyed by the raw OCR string, in small bounded caches.
+"""
+
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
+from core.approximate_match import ApproximateMatcher, weighted_edit_distance
+from core.event_store import EventStore
+
+ARROW_MARKERS = ("(❯)", "(❯❯)", "(❯❯❯)")
+COMMON_WORDS = frozenset(['the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by'])
+# Display position of the positional option labels; "Option N" labels sort by N after these
+OPTION_SLOTS = {"top option": 0, "middle option": 1, "bottom option": 2}
+
+SOURCE_SUPPORT_CARD = "Support Card"
+SOURCE_UMA_DATA = "Uma Data"
+SOURCE_URA_FINALE = "Ura Finale"
+
+# Distinct raw OCR strings remembered by the query caches
+QUERY_CACHE_SIZE = 4096
+
+
+def normalize_event_name(name):
+    """Lowercase an event name and strip the (❯) chain markers."""
+    clean = name.lower()
+    for marker in ARROW_MARKERS:
+        clean = clean.replace(marker, "")
+    return clean.strip()
+
+
+# Memoized for OCR queries only, so building the index doesn't flush it
+normalize_query = lru_cache(maxsize=QUERY_CACHE_SIZE)(normalize_event_name)
+
+
+def keywords_of(words):
+    """The words of a normalized name that aren't common words."""
+    return [word for word in words if word not in COMMON_WORDS]
+
+
+def _fuzzy_match_keywords(search_words, db_words):
+    """Word-overlap match between the keywords of two normalized event names."""
+    if len(search_words) >= 2 and len(db_words) >= 2:
+        matches = sum(1 for word in search_words if word in db_words)
+        match_ratio = matches / max(len(search_words), len(db_words))
+        return match_ratio >= 0.7  # Increased fuzzy match threshold for more precision
+    elif len(search_words) == 1 and len(db_words) == 1:
+        search_word = search_words[0]
+        db_word = db_words[0]
+        return search_word in db_word or db_word in search_word
+    return False
+
+
+def _smart_substring_match_words(search_name, search_words, db_name, db_words):
+    """Smart substring matching that prevents short words from matching longer phrases"""
+    # If search name is too short, don't match
+    if len(search_name) < 8:
+        return False
+
+    # If search name is a single word and db_name has multiple words, be more careful
+    if len(search_words) == 1 and len(db_words) > 1:
+        # Single word search in multi-word database entry - require longer words
+        search_word = search_words[0]
+        # Remove punctuation for length check
+        clean_word = ''.join(c for c in search_word if c.isalnum())
+        if len(clean_word) < 8:
+            return False
+        # Only match if the search word appears as a complete word in the database entry
+        return search_word in db_words
+    else:
+        # Multi-word search or single-word database entry
+        # Be more strict: only allow substring matching if the search name is significantly shorter
+        # This prevents "Shrine Visit" from matching "New Year's Shrine Visit"
+        if len(search_name) >= len(db_name) * 0.8:  # Search name must be at least 80% of db_name length
+            return False
+        return search_name in db_name or db_name in search_name
+
+
+def option_slot(option_name):
+    """Classify an option label as top/middle/bottom/option N.
+
+    Returns its display position, or None for labels the overlay doesn't
+    show (such as the empty label of events without a choice).
+    """
+    label = option_name.lower().strip()
+    slot = OPTION_SLOTS.get(label)
+    if slot is not None:
+        return slot
+    if label.startswith("option"):
+        number = label[len("option"):].strip()
+        if number.isdigit():
+            return len(OPTION_SLOTS) + int(number)
+    return None
+
+
+def filter_options(event_options):
+    """Keep only the option entries the overlay knows how to display, in display order."""
+    slotted = []
+    for option_name, option_reward in event_options.items():
+        slot = option_slot(option_name)
+        if slot is not None:
+            slotted.append((slot, option_name, option_reward))
+    slotted.sort(key=lambda option: option[0])
+    return {option_name: option_reward for _, option_name, option_reward in slotted}
+
+
+def _merge_source(current, source):
+    if source == SOURCE_UMA_DATA and current == SOURCE_SUPPORT_CARD:
+        return "Both"
+    if source == SOURCE_URA_FINALE and current in [SOURCE_SUPPORT_CARD, SOURCE_UMA_DATA]:
+        return "Multiple Sources"
+    return current
+
+
+def merge_events(support_events=(), uma_events=(), ura_finale_events=(), event_names=None):
+    """Merge the entries sharing a raw event name across the databases.
+
+    Returns {event name: (source, options)} in order of first appearance,
+    optionally restricted to ``event_names``.
+    """
+    merged = {}
+    for source, events in ((SOURCE_SUPPORT_CARD, support_events),
+                           (SOURCE_UMA_DATA, uma_events),
+                           (SOURCE_URA_FINALE, ura_finale_events)):
+        for event in events:
+            event_name = event.get("EventName", "")
+            if event_names is not None and event_name not in event_names:
+                continue
+            entry = merged.get(event_name)
+            if entry is None:
+                entry = merged[event_name] = [source, {}]
+            else:
+                entry[0] = _merge_source(entry[0], source)
+            entry[1].update(filter_options(event.get("EventOptions", {})))
+    # Options merged from several entries are put back in display order
+    return {event_name: (source, filter_options(options)) for event_name, (source, options) in merged.items()}
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class EventIndex:
+    """Search index over support card, uma and ura finale events.
+
+    Entries sharing a raw ``EventName`` always match together, so their
+    merged options and source provenance are resolved at build time and a
+    lookup only has to decide which names match.
+
+    ``update`` re-indexes individual names in place when a database file
+    changes; lookups hold ``lock`` so they never see a half-applied update.
+    An update also empties the ``find`` result cache.
+    """
+
+    def __init__(self, support_events=(), uma_events=(), ura_finale_events=()):
+        # Name, source and options per raw event name, in order of first appearance across the sources
+        self.store = EventStore()
+        self.name_ids = {}
+
+        # Per normalized name
+        self.clean_names = []
+        self.clean_words = []
+        self.clean_keywords = []
+        self.clean_name_events = []
+        self.exact_index = {}
+
+        for event_name, (source, options) in merge_events(support_events, uma_events, ura_finale_events).items():
+            name_id = self.name_ids[event_name] = self.store.append(event_name, source, options)
+            clean_id = self._add_clean_name(normalize_event_name(event_name))
+            self.clean_name_events[clean_id].append(name_id)
+
+        self._build_search_indexes()
+        self.approximate_matcher = ApproximateMatcher(self.clean_names)
+        self.lock = threading.RLock()
+        self._reset_find_cache()
+
+    SET_INDEXES = ("keyword_index", "word_index", "trigram_index")
+
+    def to_data(self):
+        """The index as plain lists and dicts, for the JSON database cache."""
+        data = {
+            "store": self.store.to_data(),
+            "name_ids": self.name_ids,
+            "clean_names": self.clean_names,
+            "clean_name_events": self.clean_name_events,
+            "single_keyword_names": self.single_keyword_names,
+            "approximate_matcher": self.approximate_matcher.to_data(),
+        }
+        for index_name in self.SET_INDEXES:
+            data[index_name] = {key: sorted(ids) for key, ids in getattr(self, index_name).items() if ids}
+        return data
+
+    @classmethod
+    def from_data(cls, data):
+        """Restore an index saved with ``to_data`` without re-merging or re-indexing the events."""
+        index = cls.__new__(cls)
+        index.store = EventStore.from_data(data["store"])
+        index.name_ids = data["name_ids"]
+        index.clean_names = data["clean_names"]
+        index.clean_name_events = data["clean_name_events"]
+        index.clean_words = []
+        index.clean_keywords = []
+        for clean_name in index.clean_names:
+            words = tuple(clean_name.split())
+            index.clean_words.append(words)
+            index.clean_keywords.append(tuple(keywords_of(words)))
+        # Names removed by a hot reload keep their id but have no events and aren't indexed
+        index.exact_index = {clean_name: clean_id for clean_id, clean_name in enumerate(index.clean_names)
+                             if index.clean_name_events[clean_id]}
+        index.single_keyword_names = data["single_keyword_names"]
+        for index_name in cls.SET_INDEXES:
+            setattr(index, index_name, {key: set(ids) for key, ids in data[index_name].items()})
+        index.approximate_matcher = ApproximateMatcher.from_data(data["approximate_matcher"])
+        index.lock = threading.RLock()
+        index._reset_find_cache()
+        return index
+
+    def _reset_find_cache(self):
+        # (raw OCR string, max_distance, limit) -> [(clean id, score)], least recently used first
+        self.find_cache = OrderedDict()
+        self.find_hits = 0
+        self.find_misses = 0
+
+    def _add_clean_name(self, clean_name):
+        clean_id = self.exact_index.get(clean_name)
+        if clean_id is None:
+            clean_id = self.exact_index[clean_name] = len(self.clean_names)
+            self.clean_names.append(clean_name)
+            # Tokenized once here instead of on every candidate check
+            words = tuple(clean_name.split())
+            self.clean_words.append(words)
+            self.clean_keywords.append(tuple(keywords_of(words)))
+            self.clean_name_events.append([])
+        return clean_id
+
+    def _build_search_indexes(self):
+        # Non-common words for the multi-word fuzzy path
+        self.keyword_index = {}
+        # Names with exactly one non-common word for the single-word fuzzy path
+        self.single_keyword_names = []
+        # Whole words for the single-word smart substring path
+        self.word_index = {}
+        # Character trigrams for the substring path
+        self.trigram_index = {}
+
+        for clean_id in range(len(self.clean_names)):
+            self._index_clean_name(clean_id)
+
+    def _index_clean_name(self, clean_id):
+        clean_name = self.clean_names[clean_id]
+        words = self.clean_words[clean_id]
+        keywords = self.clean_keywords[clean_id]
+        if len(keywords) == 1:
+            self.single_keyword_names.append(clean_id)
+        for word in keywords:
+            self.keyword_index.setdefault(word, set()).add(clean_id)
+        for word in words:
+            self.word_index.setdefault(word, set()).add(clean_id)
+        for trigram in _trigrams(clean_name):
+            self.trigram_index.setdefault(trigram, set()).add(clean_id)
+
+    def _unindex_clean_name(self, clean_id):
+        clean_name = self.clean_names[clean_id]
+        del self.exact_index[clean_name]
+        words = self.clean_words[clean_id]
+        keywords = self.clean_keywords[clean_id]
+        if len(keywords) == 1:
+            self.single_keyword_names.remove(clean_id)
+        for word in keywords:
+            self.keyword_index[word].discard(clean_id)
+        for word in words:
+            self.word_index[word].discard(clean_id)
+        for trigram in _trigrams(clean_name):
+            self.trigram_index[trigram].discard(clean_id)
+        self.approximate_matcher.remove(clean_id)
+
+    def _add_event_name(self, event_name, source, options):
+        name_id = self.name_ids[event_name] = self.store.append(event_name, source, options)
+        clean_name = normalize_event_name(event_name)
+        clean_id = self.exact_index.get(clean_name)
+        if clean_id is None:
+            clean_id = self._add_clean_name(clean_name)
+            self._index_clean_name(clean_id)
+            # Both id spaces grow together, so the matcher's id is the clean id
+            self.approximate_matcher.add(clean_name)
+        self.clean_name_events[clean_id].append(name_id)
+
+    def _remove_event_name(self, event_name):
+        # The event's rows in the store stay behind as an unreachable tombstone
+        name_id = self.name_ids.pop(event_name)
+        clean_id = self.exact_index[normalize_event_name(event_name)]
+        self.clean_name_events[clean_id].remove(name_id)
+        if not self.clean_name_events[clean_id]:
+            self._unindex_clean_name(clean_id)
+
+    def update(self, event_names, support_events=(), uma_events=(), ura_finale_events=()):
+        """Re-index the given raw event names from the new database contents.
+
+        Names missing from every database are removed, new ones are added and
+        the rest get their merged source and options recomputed.
+
+        Returns:
+            (added, removed, changed) name counts.
+        """
+        wanted = set(event_names)
+        merged = merge_events(support_events, uma_events, ura_finale_events, wanted)
+
+        added = removed = changed = 0
+        with self.lock:
+            for event_name in wanted:
+                name_id = self.name_ids.get(event_name)
+                if event_name in merged:
+                    source, options = merged[event_name]
+                    if name_id is None:
+                        self._add_event_name(event_name, source, options)
+                        added += 1
+                    else:
+                        self.store.replace(name_id, source, options)
+                        changed += 1
+                elif name_id is not None:
+                    self._remove_event_name(event_name)
+                    removed += 1
+            self.find_cache.clear()
+        return added, removed, changed
+
+    def __len__(self):
+        return len(self.name_ids)
+
+    def vocabulary(self):
+        """Every word that occurs in an event name, without the (❯) markers."""
+        words = set()
+        with self.lock:
+            event_names = list(self.name_ids)
+        for event_name in event_names:
+            for marker in ARROW_MARKERS:
+                event_name = event_name.replace(marker, "")
+            words.update(event_name.split())
+        return sorted(words)
+
+    def _substring_candidates(self, clean_query):
+        postings = []
+        for trigram in _trigrams(clean_query):
+            posting = self.trigram_index.get(trigram)
+            if not posting:
+                return set()
+            postings.append(posting)
+        postings.sort(key=len)
+        return set(postings[0]).intersection(*postings[1:])
+
+    def match_clean_names(self, clean_query):
+        """Return the ids of normalized names matching a normalized query."""
+        matched = set()
+        exact_id = self.exact_index.get(clean_query)
+        if exact_id is not None:
+            matched.add(exact_id)
+
+        words = clean_query.split()
+        keywords = keywords_of(words)
+
+        candidates = set()
+        for word in keywords:
+            candidates.update(self.keyword_index.get(word, ()))
+        if len(keywords) == 1:
+            candidates.update(self.single_keyword_names)
+        candidates -= matched
+        for clean_id in candidates:
+            if _fuzzy_match_keywords(keywords, self.clean_keywords[clean_id]):
+                matched.add(clean_id)
+
+        if len(clean_query) >= 8:
+            candidates = self._substring_candidates(clean_query)
+            if len(words) == 1:
+                candidates.update(self.word_index.get(words[0], ()))
+            candidates -= matched
+            for clean_id in candidates:
+                if _smart_substring_match_words(clean_query, words, self.clean_names[clean_id],
+                                                self.clean_words[clean_id]):
+                    matched.add(clean_id)
+
+        return matched
+
+    def find(self, event_name, max_distance=None, limit=3):
+        """Find the events best matching a single OCR read.
+
+        Names within the weighted edit distance budget are returned ranked,
+        best first; an exact match suppresses the approximate ones. When
+        nothing is close enough the word-overlap rules are used instead, which
+        still catch reordered or truncated titles. Each result also carries
+        a ``score`` between 0 and 1.
+
+        ``options`` in the results are read-only mappings shared with the
+        index, in display order; copy one before changing it.
+
+        The ranking is cached per raw OCR string; the result dict itself is
+        rebuilt on every call, so callers may modify it.
+        """
+        key = (event_name, max_distance, limit)
+        with self.lock:
+            ranked = self.find_cache.get(key)
+            if ranked is not None:
+                self.find_hits += 1
+                self.find_cache.move_to_end(key)
+            else:
+                self.find_misses += 1
+                ranked = self._rank(normalize_query(event_name), max_distance, limit)
+                self.find_cache[key] = ranked
+                if len(self.find_cache) > QUERY_CACHE_SIZE:
+                    self.find_cache.popitem(last=False)
+
+            found_events = {}
+            for clean_id, score in ranked:
+                for name_id in self.clean_name_events[clean_id]:
+                    found_events[self.store.name(name_id)] = {
+                        "source": self.store.source(name_id),
+                        "options": self.store.options(name_id),
+                        "score": score,
+                    }
+            return found_events
+
+    def _rank(self, clean_query, max_distance, limit):
+        """Return [(clean id, score)] for a normalized query, best first."""
+        ranked = self.approximate_matcher.search(clean_query, max_distance, limit)
+        if ranked and ranked[0][1] == 0:
+            ranked = [result for result in ranked if result[1] == 0]
+        if ranked:
+            return [(clean_id, score) for clean_id, _, score in ranked]
+        ranked = []
+        for clean_id in self.match_clean_names(clean_query):
+            clean_name = self.clean_names[clean_id]
+            distance = weighted_edit_distance(clean_query, clean_name)
+            ranked.append((clean_id, max(0.0, 1.0 - distance / max(len(clean_query), len(clean_name)))))
+        ranked.sort(key=lambda result: (-result[1], result[0]))
+        return ranked if limit is None else ranked[:limit]
+
+    def cache_summary(self):
+        """Return ((find hits, misses), (normalize hits, misses)) of the query caches."""
+        normalize = normalize_query.cache_info()
+        with self.lock:
+            return (self.find_hits, self.find_misses), (normalize.hits, normalize.misses)
+
+    def resolve(self, matches):
+        """Rebuild a ``find`` result from ``(event name, score)`` pairs.
+
+        Names no longer in the databases are skipped.
+        """
+        found_events = {}
+        with self.lock:
+            for event_name, score in matches:
+                name_id = self.name_ids.get(event_name)
+                if name_id is not None:
+                    found_events[event_name] = {
+                        "source": self.store.source(name_id),
+                        "options": self.store.options(name_id),
+                        "score": score,
+                    }
+        return found_events
@@ -1,71 +1,87 @@
-import json
-import os
 import time
-import pyautogui
-import re
 import tkinter as tk
 from tkinter import ttk
-from pyautogui import ImageNotFoundException
-from utils.screenshot import capture_region
-from core.ocr import extract_event_name_text
-
-import cv2
-import numpy as np
-from utils.match_template import is_match_template
-
-
-# Precompile regular expressions for better performance
-l_pattern = re.compile(r'l\b')
-l_exclamation_pattern = re.compile(r'l([!?.,])')
-double_exclamation_pattern = re.compile(r'[!l]{2,}')
-trailing_exclamation_pattern = re.compile(r'!+$')
-trailing_letter_pattern = re.compile(r'\s+[A-Za-z]\s*$')
-trailing_letter_pattern2 = re.compile(r'[A-Za-z]\s*$')
+from core.event_database import EventDatabase
+from core.glyph_ocr import GLYPH_ATLAS_PATH
+from core.ocr import configure_glyph_atlas, configure_vocabulary
+from core.perf import PerfStats
+from core.preprocess import Preprocessor
+from core.layout import Layout
+from core.overlay_render import OverlayRenderer
+from core.scheduler import AdaptiveScheduler
+from core.session_log import SESSION_LOG_PATH, SessionLog
+from core.pipeline import (EventPipeline, EVENT_REGION, LEFT_SCREEN_REGION, SUPPORT_CARD_EVENT_REGION,
+                           DATE_REGION, OPTION_LABEL_BOX, OPTION_PITCH, EVENT_TEMPLATE_PATH, SUPPORT_CARD_EVENT_TEMPLATE_PATH,
+                           UI_STATUS, UI_RAISE, UI_LOWER, UI_EVENT, UI_SUPPORT_EVENT)
+
+
+OCR_CACHE_PATH = "assets/events/ocr_results.cache"
+OCR_VOCABULARY_PATH = "assets/events/event_words.cache"
+PERF_LOG_INTERVAL_MS = 5000
+STATS_REFRESH_MS = 1000
 
 
 class EventOverlay:
-    def __init__(self):
-        self.event_region = (240, 200, 365, 45)
-        self.overlay_x = 958
-        self.overlay_y = 810
-        self.overlay_width = 798
-        self.overlay_height = 269
-        self.support_events = []
-        self.uma_events = []
-        self.ura_finale_events = []
+    def __init__(self, perf_log_path=None, cpu_budget=None, preprocess_options=None, resolution=None):
+        self.startup_start = time.perf_counter()
+        self.layout = Layout(*resolution) if resolution else Layout.detect()
+        self.event_region = self.layout.region(EVENT_REGION)
+        self.overlay_x, self.overlay_y = self.layout.point(958, 810)
+        self.overlay_width, self.overlay_height = self.layout.size(798, 269)
+        self.event_index = None
         self.load_databases()
-        self.setup_overlay()
-        self.last_event_name = None
-        self.event_displayed = False
-        self.event_detection_start = None
-
-        self.left_screen_region = (0, 0, 1920//2, 1080)
-        self.support_card_event_region = (240, 160, 200, 70)
-        self.event_template = cv2.imread("assets/icons/event_choice_1.png")
-        self.support_card_event_template = cv2.imread("assets/icons/support_card_event.png")
-        self.tracked_support_event = []
+        configure_vocabulary(self.event_index.vocabulary(), OCR_VOCABULARY_PATH)
+        if (preprocess_options or {}).get("crop"):
+            # The atlas is built from the whole title region; trimmed crops would scale glyphs differently
+            print("   ✓ Title cropping is on, reading every title with Tesseract")
+        elif configure_glyph_atlas(GLYPH_ATLAS_PATH):
+            print("   ✓ Glyph atlas loaded, Tesseract only reads unclear titles")
+
+        self.left_screen_region = self.layout.region(LEFT_SCREEN_REGION)
+        self.support_card_event_region = self.layout.region(SUPPORT_CARD_EVENT_REGION)
+        self.event_template = self.layout.template(EVENT_TEMPLATE_PATH)
+        self.support_card_event_template = self.layout.template(SUPPORT_CARD_EVENT_TEMPLATE_PATH)
+        # Session log rows after tracker_start_id are listed; the rows up to tracker_shown_id already are
+        self.tracker_start_id = 0
+        self.tracker_shown_id = 0
         self.tracker_window = None
         self.tracker_button = None
         self.always_on_top = False
+        self.highlight_reset = None
+        self.stats_window = None
+        self.stats_button = None
+        self.perf = PerfStats()
+        self.perf_log_path = perf_log_path
+        self.perf.enabled = perf_log_path is not None
+        scheduler = AdaptiveScheduler(cpu_budget=cpu_budget) if cpu_budget else AdaptiveScheduler()
+        self.pipeline = EventPipeline(self.event_index, self.event_template, self.support_card_event_template,
+                                      self.left_screen_region, self.support_card_event_region, self.event_region,
+                                      ocr_cache_path=OCR_CACHE_PATH, perf=self.perf, scheduler=scheduler,
+                                      preprocessor=Preprocessor(perf=self.perf, **(preprocess_options or {})),
+                                      detector_options=self.layout.detector_options(),
+                                      session_log=SessionLog(SESSION_LOG_PATH),
+                                      date_region=self.layout.region(DATE_REGION),
+                                      option_label_box=self.layout.relative(OPTION_LABEL_BOX),
+                                      option_pitch=round(OPTION_PITCH * self.layout.scale))
+        self.setup_overlay()
+        self.pipeline.start()
+        self.database.watch(self.on_databases_reloaded)
 
     def load_databases(self):
-        print("Loading event databases...")
-        if os.path.exists("assets/events/support_card.json"):
-            with open("assets/events/support_card.json", "r", encoding="utf-8-sig") as f:
-                self.support_events = json.load(f)
-            print(f"   ✓ Loaded {len(self.support_events)} support card events")
-        if os.path.exists("assets/events/uma_data.json"):
-            with open("assets/events/uma_data.json", "r", encoding="utf-8-sig") as f:
-                uma_data = json.load(f)
-                for character in uma_data:
-                    if "UmaEvents" in character:
-                        self.uma_events.extend(character["UmaEvents"])
-            print(f"   ✓ Loaded {len(self.uma_events)} uma events")
-        if os.path.exists("assets/events/ura_finale.json"):
-            with open("assets/events/ura_finale.json", "r", encoding="utf-8-sig") as f:
-                self.ura_finale_events = json.load(f)
-            print(f"   ✓ Loaded {len(self.ura_finale_events)} ura finale events")
-        print("   ✓ Databases loaded successfully")
+        self.database = EventDatabase.load()
+        self.event_index = self.database.event_index
+
+    def on_databases_reloaded(self, counts):
+        """Runs on the watcher thread; the index has already been updated in place"""
+        added, removed, changed = counts
+        self.pipeline.emit(UI_STATUS, f"🔄 Databases updated: {added} added, {removed} removed, {changed} changed",
+                           '#17A2B8')
+
+    def window_geometry(self, width, height, x, y):
+        """Tk geometry string for a window placed in 1920x1080 reference coordinates"""
+        width, height = self.layout.size(width, height)
+        x, y = self.layout.point(x, y)
+        return f"{width}x{height}+{x}+{y}"
 
     def setup_overlay(self):
         self.root = tk.Tk()
@@ -74,7 +90,8 @@ class EventOverlay:
         self.root.overrideredirect(True)
         self.root.attributes('-topmost', False)
         self.root.attributes('-alpha', 0.9)
-        style = ttk.Style()
+        # One style object for the lifetime of the overlay; highlight styles are configured here once
+        self.style = style = ttk.Style()
         style.theme_use('clam')
         self.main_frame = ttk.Frame(self.root, padding="10")
         self.main_frame.pack(fill=tk.BOTH, expand=True)
@@ -86,17 +103,24 @@ class EventOverlay:
         self.options_text.pack(fill=tk.BOTH, expand=True, pady=(0, 10))
         self.status_label = ttk.Label(self.main_frame, text="🔄 Monitoring for events...", font=('Arial', 10), foreground='#666666')
         self.status_label.pack()
+        print(f"   ✓ Ready to monitor in {(time.perf_counter() - self.startup_start) * 1000:.0f} ms")
         scrollbar = ttk.Scrollbar(self.main_frame, orient="vertical", command=self.options_text.yview)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         self.options_text.configure(yscrollcommand=scrollbar.set)
+        self.renderer = OverlayRenderer(self.event_name_label, self.options_text, self.status_label, self.perf)
 
         # Event Tracker button
         button_frame = ttk.Frame(self.main_frame)
         button_frame.pack(fill=tk.X)
         style.configure('Bold.TButton', font=('Arial', 12, 'bold'))
+        style.configure('Highlight.TButton', font=('Arial', 12, 'bold'), background='#FFD700')
         self.tracker_button = ttk.Button(button_frame, text="Ʊ Tracker", style='Bold.TButton', command=self.toggle_tracker_window)
         self.tracker_button.pack(side=tk.LEFT)
 
+        # Performance stats button
+        self.stats_button = ttk.Button(button_frame, text="📊 Stats", command=self.toggle_stats_window)
+        self.stats_button.pack(side=tk.LEFT, padx=(10, 0))
+
         # Pushpin button
         style.configure('Pushpin.TButton', font=('Arial', 8))
         style.configure('Pushpin.Active.TButton', font=('Arial', 8, 'bold'))
@@ -105,6 +129,8 @@ class EventOverlay:
 
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
         self.monitor_events()
+        if self.perf_log_path:
+            self.root.after(PERF_LOG_INTERVAL_MS, self.write_perf_log)
 
     def toggle_always_on_top(self):
         """Toggle the always on top state"""
@@ -133,7 +159,7 @@ class EventOverlay:
         """Create the event tracker window"""
         self.tracker_window = tk.Toplevel(self.root)
         self.tracker_window.title("Event Tracker")
-        self.tracker_window.geometry("400x300+950+478")
+        self.tracker_window.geometry(self.window_geometry(400, 300, 950, 478))
         self.tracker_window.attributes('-topmost', True)
 
         # Make sure to reset the button color when window is closed
@@ -158,7 +184,8 @@ class EventOverlay:
         self.tracked_listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
 
-        # Update the listbox with current events
+        # List the events tracked so far
+        self.tracker_shown_id = self.tracker_start_id
         self.update_tracked_events_list()
 
         # Button frame
@@ -174,16 +201,19 @@ class EventOverlay:
         close_button.pack(side=tk.LEFT)
 
     def update_tracked_events_list(self):
-        """Update the listbox with tracked events"""
+        """Append the support events logged since the listbox was last updated"""
         if hasattr(self, 'tracked_listbox') and self.tracker_window and self.tracker_window.winfo_exists():
-            self.tracked_listbox.delete(0, tk.END)
-            for event in self.tracked_support_event:
-                self.tracked_listbox.insert(tk.END, event)
+            for row_id, event_name, _ in self.pipeline.session_log.support_events(after_id=self.tracker_shown_id):
+                self.tracked_listbox.insert(tk.END, event_name)
+                self.tracker_shown_id = row_id
 
     def clear_tracked_events(self):
         """Clear all tracked events"""
-        self.tracked_support_event.clear()
-        self.update_tracked_events_list()
+        # The log keeps them; the tracker just starts listing after the newest row
+        self.tracker_start_id = self.tracker_shown_id = self.pipeline.session_log.last_id()
+        self.pipeline.clear_tracked_events()
+        if hasattr(self, 'tracked_listbox') and self.tracker_window and self.tracker_window.winfo_exists():
+            self.tracked_listbox.delete(0, tk.END)
 
     def close_tracker_window(self):
         """Close the tracker window"""
@@ -191,303 +221,108 @@ class EventOverlay:
             self.tracker_window.destroy()
         self.tracker_window = None
 
+    def toggle_stats_window(self):
+        """Toggle the performance stats panel"""
+        if self.stats_window and self.stats_window.winfo_exists():
+            self.close_stats_window()
+        else:
+            self.create_stats_window()
+
+    def create_stats_window(self):
+        """Create the performance stats panel next to the tracker window"""
+        self.stats_window = tk.Toplevel(self.root)
+        self.stats_window.title("Performance")
+        self.stats_window.geometry(self.window_geometry(420, 300, 1355, 478))
+        self.stats_window.attributes('-topmost', True)
+        self.stats_window.protocol("WM_DELETE_WINDOW", self.close_stats_window)
+
+        stats_frame = ttk.Frame(self.stats_window, padding="10")
+        stats_frame.pack(fill=tk.BOTH, expand=True)
+        title_label = ttk.Label(stats_frame, text="📊 Hot Path Timings (ms)", font=('Arial', 14, 'bold'))
+        title_label.pack(pady=(0, 10))
+        self.stats_label = ttk.Label(stats_frame, text="Collecting...", font=('Consolas', 10), justify=tk.LEFT)
+        self.stats_label.pack(fill=tk.BOTH, expand=True)
+
+        # Only pay for the spans while someone is looking at them
+        self.perf.enabled = True
+        self.refresh_stats_window()
+
+    def refresh_stats_window(self):
+        """Update the stats panel while it is open"""
+        if self.stats_window and self.stats_window.winfo_exists():
+            self.stats_label.config(text=f"{self.perf.format_summary()}\n\n{self.renderer.format_summary()}")
+            self.root.after(STATS_REFRESH_MS, self.refresh_stats_window)
+
+    def close_stats_window(self):
+        """Close the stats panel"""
+        if self.stats_window and self.stats_window.winfo_exists():
+            self.stats_window.destroy()
+        self.stats_window = None
+        self.perf.enabled = self.perf_log_path is not None
+        if not self.perf.enabled:
+            self.perf.reset()
+
+    def write_perf_log(self):
+        """Append the rolling timings to the JSON-lines log"""
+        self.perf.write_log(self.perf_log_path)
+        self.root.after(PERF_LOG_INTERVAL_MS, self.write_perf_log)
+
     def highlight_tracker_button(self, duration=2000):
         """Temporarily highlight the tracker button"""
         if self.tracker_button:
-            # Store original style
-            style = ttk.Style()
-            original_background = style.configure('TButton', 'background')
-
-            # Apply highlight
-            style.configure('Highlight.TButton', background='#FFD700')
-            self.tracker_button.configure(style='Highlight.TButton')
-
-            # Reset after duration
-            self.root.after(duration, lambda: self.tracker_button.configure(style='TButton'))
-
-    def generate_event_variations(self, event_name):
-        event_variations = [event_name]
-
-        if 'l' in event_name:
-            variation = l_pattern.sub('!', event_name)
-            if variation != event_name and variation not in event_variations:
-                event_variations.append(variation)
-            variation2 = l_exclamation_pattern.sub(r'!\1', event_name)
-            if variation2 != event_name and variation2 not in event_variations:
-                event_variations.append(variation2)
-        if '!' in event_name:
-            variation = event_name.replace('!', 'l')
-            if variation not in event_variations:
-                event_variations.append(variation)
-        if '%' in event_name:
-            variation = event_name.replace('%', '☆')
-            if variation not in event_variations:
-                event_variations.append(variation)
-        if '☆' in event_name:
-            variation = event_name.replace('☆', '%')
-            if variation not in event_variations:
-                event_variations.append(variation)
-        cleaned_variations = []
-        for variation in event_variations:
-            cleaned = double_exclamation_pattern.sub('!', variation)
-            if cleaned not in event_variations and cleaned != variation:
-                cleaned_variations.append(cleaned)
-            # Add variation without trailing exclamation marks
-            no_exclamation = trailing_exclamation_pattern.sub('', variation).strip()
-            if no_exclamation not in event_variations and no_exclamation != variation and no_exclamation:
-                cleaned_variations.append(no_exclamation)
-            # Add variation without trailing single letters (OCR artifacts)
-            no_trailing_letter = trailing_letter_pattern.sub('', variation).strip()
-            if no_trailing_letter not in event_variations and no_trailing_letter != variation and no_trailing_letter:
-                cleaned_variations.append(no_trailing_letter)
-            no_trailing_letter2 = trailing_letter_pattern2.sub('', variation).strip()
-            if no_trailing_letter2 not in event_variations and no_trailing_letter2 != variation and no_trailing_letter2:
-                cleaned_variations.append(no_trailing_letter2)
-        event_variations.extend(cleaned_variations)
-        word_order_variations = []
-        for variation in event_variations:
-            words = variation.split()
-            if len(words) >= 3:
-                if len(words) == 3:
-                    import itertools
-                    for perm in itertools.permutations(words):
-                        perm_text = ' '.join(perm)
-                        if perm_text not in event_variations and perm_text != variation:
-                            word_order_variations.append(perm_text)
-                elif len(words) == 4:
-                    first_half = ' '.join(words[:2])
-                    second_half = ' '.join(words[2:])
-                    swapped = f"{second_half} {first_half}"
-                    if swapped not in event_variations and swapped != variation:
-                        word_order_variations.append(swapped)
-        event_variations.extend(word_order_variations)
-        return event_variations
-
-    def search_events(self, event_variations):
-        found_events = {}
-        for event in self.support_events:
-            db_event_name = event.get("EventName", "").lower()
-            clean_db_name = db_event_name.replace("(❯)", "").replace("(❯❯)", "").replace("(❯❯❯)", "").strip()
-            for variation in event_variations:
-                clean_search_name = variation.lower().strip()
-                # Clean search name the same way as database names
-                clean_search_name = clean_search_name.replace("(❯)", "").replace("(❯❯)", "").replace("(❯❯❯)", "").strip()
-                if clean_db_name == clean_search_name:
-                    event_name_key = event['EventName']
-                    if event_name_key not in found_events:
-                        found_events[event_name_key] = {"source": "Support Card", "options": {}}
-                    event_options = event.get("EventOptions", {})
-                    for option_name, option_reward in event_options.items():
-                        if option_name and any(keyword in option_name.lower() for keyword in ["top option", "bottom option", "middle option", "option1", "option2", "option3"]):
-                            found_events[event_name_key]["options"][option_name] = option_reward
-                    break
-                elif self.fuzzy_match(clean_search_name, clean_db_name) or self.smart_substring_match(clean_search_name, clean_db_name):
-                    event_name_key = event['EventName']
-                    if event_name_key not in found_events:
-                        found_events[event_name_key] = {"source": "Support Card", "options": {}}
-                    event_options = event.get("EventOptions", {})
-                    for option_name, option_reward in event_options.items():
-                        if option_name and any(keyword in option_name.lower() for keyword in ["top option", "bottom option", "middle option", "option1", "option2", "option3"]):
-                            found_events[event_name_key]["options"][option_name] = option_reward
-                    break
-        for event in self.uma_events:
-            db_event_name = event.get("EventName", "").lower()
-            clean_db_name = db_event_name.replace("(❯)", "").replace("(❯❯)", "").replace("(❯❯❯)", "").strip()
-            for variation in event_variations:
-                clean_search_name = variation.lower().strip()
-                # Clean search name the same way as database names
-                clean_search_name = clean_search_name.replace("(❯)", "").replace("(❯❯)", "").replace("(❯❯❯)", "").strip()
-                if clean_db_name == clean_search_name:
-                    event_name_key = event['EventName']
-                    if event_name_key not in found_events:
-                        found_events[event_name_key] = {"source": "Uma Data", "options": {}}
-                    elif found_events[event_name_key]["source"] == "Support Card":
-                        found_events[event_name_key]["source"] = "Both"
-                    event_options = event.get("EventOptions", {})
-                    for option_name, option_reward in event_options.items():
-                        if option_name and any(keyword in option_name.lower() for keyword in ["top option", "bottom option", "middle option", "option1", "option2", "option3"]):
-                            found_events[event_name_key]["options"][option_name] = option_reward
-                    break
-                elif self.fuzzy_match(clean_search_name, clean_db_name) or self.smart_substring_match(clean_search_name, clean_db_name):
-                    event_name_key = event['EventName']
-                    if event_name_key not in found_events:
-                        found_events[event_name_key] = {"source": "Uma Data", "options": {}}
-                    elif found_events[event_name_key]["source"] == "Support Card":
-                        found_events[event_name_key]["source"] = "Both"
-                    event_options = event.get("EventOptions", {})
-                    for option_name, option_reward in event_options.items():
-                        if option_name and any(keyword in option_name.lower() for keyword in ["top option", "bottom option", "middle option", "option1", "option2", "option3"]):
-                            found_events[event_name_key]["options"][option_name] = option_reward
-                    break
-        for event in self.ura_finale_events:
-            db_event_name = event.get("EventName", "").lower()
-            clean_db_name = db_event_name.replace("(❯)", "").replace("(❯❯)", "").replace("(❯❯❯)", "").strip()
-            for variation in event_variations:
-                clean_search_name = variation.lower().strip()
-                # Clean search name the same way as database names
-                clean_search_name = clean_search_name.replace("(❯)", "").replace("(❯❯)", "").replace("(❯❯❯)", "").strip()
-                if clean_db_name == clean_search_name:
-                    event_name_key = event['EventName']
-                    if event_name_key not in found_events:
-                        found_events[event_name_key] = {"source": "Ura Finale", "options": {}}
-                    elif found_events[event_name_key]["source"] in ["Support Card", "Uma Data"]:
-                        found_events[event_name_key]["source"] = "Multiple Sources"
-                    event_options = event.get("EventOptions", {})
-                    for option_name, option_reward in event_options.items():
-                        if option_name and any(keyword in option_name.lower() for keyword in ["top option", "bottom option", "middle option", "option1", "option2", "option3"]):
-                            found_events[event_name_key]["options"][option_name] = option_reward
-                    break
-                elif self.fuzzy_match(clean_search_name, clean_db_name) or self.smart_substring_match(clean_search_name, clean_db_name):
-                    event_name_key = event['EventName']
-                    if event_name_key not in found_events:
-                        found_events[event_name_key] = {"source": "Ura Finale", "options": {}}
-                    elif found_events[event_name_key]["source"] in ["Support Card", "Uma Data"]:
-                        found_events[event_name_key]["source"] = "Multiple Sources"
-                    event_options = event.get("EventOptions", {})
-                    for option_name, option_reward in event_options.items():
-                        if option_name and any(keyword in option_name.lower() for keyword in ["top option", "bottom option", "middle option", "option1", "option2", "option3"]):
-                            found_events[event_name_key]["options"][option_name] = option_reward
-                    break
-        return found_events
-
-    def fuzzy_match(self, search_name, db_name):
-        common_words = ['the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by']
-        search_words = [word for word in search_name.split() if word not in common_words]
-        db_words = [word for word in db_name.split() if word not in common_words]
-        if len(search_words) >= 2 and len(db_words) >= 2:
-            matches = sum(1 for word in search_words if word in db_words)
-            match_ratio = matches / max(len(search_words), len(db_words))
-            return match_ratio >= 0.7  # Increased fuzzy match threshold for more precision
-        elif len(search_words) == 1 and len(db_words) == 1:
-            search_word = search_words[0]
-            db_word = db_words[0]
-            return search_word in db_word or db_word in search_word
-        return False
-
-    def smart_substring_match(self, search_name, db_name):
-        """Smart substring matching that prevents short words from matching longer phrases"""
-        # If search name is too short, don't match
-        if len(search_name) < 8:
-            return False
-        
-        # If search name is a single word and db_name has multiple words, be more careful
-        search_words = search_name.split()
-        db_words = db_name.split()
-        
-        if len(search_words) == 1 and len(db_words) > 1:
-            # Single word search in multi-word database entry - require longer words
-            search_word = search_words[0]
-            # Remove punctuation for length check
-            clean_word = ''.join(c for c in search_word if c.isalnum())
-            if len(clean_word) < 8:
-                return False
-            # Only match if the search word appears as a complete word in the database entry
-            return search_word in db_words
-        else:
-            # Multi-word search or single-word database entry
-            # Be more strict: only allow substring matching if the search name is significantly shorter
-            # This prevents "Shrine Visit" from matching "New Year's Shrine Visit"
-            if len(search_name) >= len(db_name) * 0.8:  # Search name must be at least 80% of db_name length
-                return False
-            return search_name in db_name or db_name in search_name
-
-    def update_overlay(self, event_name, found_events):
-        if found_events:
-            event_name_key = list(found_events.keys())[0]
-            self.event_name_label.config(text=f"📋 {event_name_key}")
-            self.options_text.delete(1.0, tk.END)
-            for event_name_key, event_data in found_events.items():
-                self.options_text.insert(tk.END, f"📍 Source: {event_data['source']}\n")
-                self.options_text.insert(tk.END, "🎯 Options:\n")
-                options = event_data["options"]
-                if options:
-                    for option_name, option_reward in options.items():
-                        reward_single_line = option_reward.replace("\r\n", ", ").replace("\n", ", ").replace("\r", ", ")
-                        self.options_text.insert(tk.END, f"   {option_name}: {reward_single_line}\n")
-                    option_count = len(options)
-                    self.options_text.insert(tk.END, f"\n📊 Total options: {option_count}\n")
-                else:
-                    self.options_text.insert(tk.END, "   No valid options found\n")
-            self.status_label.config(text="✅ Event found!", foreground='#28A745')
-        else:
-            self.event_name_label.config(text=f"❓ {event_name}")
-            self.options_text.delete(1.0, tk.END)
-            self.options_text.insert(tk.END, "❌ Unknown event - not found in database\n")
-            self.options_text.insert(tk.END, f"Searched for: '{event_name}'\n")
-            self.status_label.config(text="❌ Unknown event", foreground='#DC3545')
+            if self.highlight_reset is None:
+                self.tracker_button.configure(style='Highlight.TButton')
+            else:
+                # Already highlighted: just push the reset back
+                self.root.after_cancel(self.highlight_reset)
+            self.highlight_reset = self.root.after(duration, self.reset_tracker_button)
+
+    def reset_tracker_button(self):
+        self.highlight_reset = None
+        self.tracker_button.configure(style='Bold.TButton')
+
+    def update_overlay(self, event_name, found_events, option_labels=()):
+        self.renderer.render_event(event_name, found_events, option_labels)
 
     def monitor_events(self):
-        try:
+        """Apply pipeline results to the widgets; all capture and OCR happens in worker threads."""
+        for kind, args in self.pipeline.ui_messages.drain():
             try:
-                left_screenshot = capture_region(self.left_screen_region)
-                left_cv_image = np.array(left_screenshot)[:, :, ::-1]
-                event_icon = is_match_template(left_cv_image, self.event_template, threshold=0.8)
-
-                support_screenshot = capture_region(self.support_card_event_region)
-                support_cv_image = np.array(support_screenshot)[:, :, ::-1]
-                support_card_event = is_match_template(support_cv_image, self.support_card_event_template, threshold=0.8)
-            except ImageNotFoundException:
-                event_icon = None
-                support_card_event = None
-            if event_icon or support_card_event:
-                if not self.always_on_top:  # Only remove topmost if not in always-on-top mode
-                    self.root.attributes('-topmost', True)
-                self.root.lift()
-                if self.event_detection_start is None:
-                    self.event_detection_start = time.time()
-                    if support_card_event:
-                        self.status_label.config(text="👁️ Support event detected, waiting for stability...", foreground='#FFC107')
-                    else:  # event_icon only
-                        self.status_label.config(text="👁️ Event icon detected, waiting for stability...", foreground='#FFC107')
-                if self.event_detection_start and not self.event_displayed:
-                    time_present = time.time() - self.event_detection_start
-                    if time_present >= 0.05:
-                        self.status_label.config(text="✅ Processing event...", foreground='#17A2B8')
-                        event_image = capture_region(self.event_region)
-                        event_name = extract_event_name_text(event_image)
-                        event_name = event_name.strip()
-
-                        if support_card_event:
-                            if event_name and event_name not in self.tracked_support_event and event_name != "A Hint for Growth":
-                                event_variations = self.generate_event_variations(event_name)
-                                found_events = self.search_events(event_variations)
-                                if found_events:
-                                    found_event_name = list(found_events.keys())[0]
-                                    if found_event_name and found_event_name not in self.tracked_support_event:
-                                        self.tracked_support_event.append(found_event_name)
-                                        self.update_tracked_events_list()
-                                        self.highlight_tracker_button()
-                        if event_icon:
-                            if event_name and event_name != self.last_event_name:
-                                event_variations = self.generate_event_variations(event_name)
-                                found_events = self.search_events(event_variations)
-                                self.update_overlay(event_name, found_events)
-                                self.last_event_name = event_name
-                                self.event_displayed = True
-
-                        self.event_detection_start = None
-            elif not event_icon and not support_card_event:
-                if not self.always_on_top:  # Only remove topmost if not in always-on-top mode
-                    self.root.attributes('-topmost', False)
-                if self.event_displayed:
-                    self.event_displayed = False
-                    self.last_event_name = None
-                    self.status_label.config(text="🔄 Waiting for next event...", foreground='#6C757D')
-                elif self.event_detection_start:
-                    self.event_detection_start = None
-                    self.status_label.config(text="❌ Event disappeared too quickly", foreground='#DC3545')
-
-            self.root.after(500, self.monitor_events)
-        except Exception as e:
-            self.status_label.config(text=f"❌ Error: {str(e)}", foreground='#DC3545')
-            self.root.after(500, self.monitor_events)
+                with self.perf.span("widgets"):
+                    self.apply_pipeline_update(kind, *args)
+            except Exception as e:
+                self.renderer.render_status(f"❌ Error: {str(e)}", '#DC3545')
+        self.root.after(50, self.monitor_events)
+
+    def apply_pipeline_update(self, kind, *args):
+        if kind == UI_STATUS:
+            self.renderer.render_status(*args)
+        elif kind == UI_RAISE:
+            if not self.always_on_top:  # Only remove topmost if not in always-on-top mode
+                self.root.attributes('-topmost', True)
+            self.root.lift()
+        elif kind == UI_LOWER:
+            if not self.always_on_top:  # Only remove topmost if not in always-on-top mode
+                self.root.attributes('-topmost', False)
+        elif kind == UI_EVENT:
+            event_name, found_events, option_labels = args
+            self.update_overlay(event_name, found_events, option_labels)
+        elif kind == UI_SUPPORT_EVENT:
+            # The pipeline only reports newly tracked events, already in the session log
+            self.update_tracked_events_list()
+            self.highlight_tracker_button()
 
     def on_closing(self):
         print("🛑 Event overlay stopped by user")
+        self.database.stop_watching()
+        self.pipeline.stop()
+        updates, unchanged, tk_calls = self.renderer.summary()
+        print(f"   ✓ Overlay renders: {updates} updates, {unchanged} skipped as unchanged, {tk_calls} Tk calls")
         self.root.destroy()
 
     def run(self):
         print("🎮 Event Overlay Started")
+        print(f"🖥️ Screen layout: {self.layout}")
         print(f"📍 Overlay position: ({self.overlay_x}, {self.overlay_y})")
         print(f"📏 Overlay size: {self.overlay_width}x{self.overlay_height}")
         print("Press Ctrl+C or close the overlay window to stop")
@@ -497,8 +332,9 @@ class EventOverlay:
         except KeyboardInterrupt:
             self.on_closing()
 
-def main():
-    overlay = EventOverlay()
+def main(perf_log_path=None, cpu_budget=None, preprocess_options=None, resolution=None):
+    overlay = EventOverlay(perf_log_path=perf_log_path, cpu_budget=cpu_budget,
+                           preprocess_options=preprocess_options, resolution=resolution)
     overlay.run()
 
 if __name__ == "__main__":
@@ -0,0 +1,115 @@
+"""Columnar storage for the per-event data the overlay displays.
+
+Instead of one dict per event with its own copy of every option label and
+reward string, each distinct string is stored once in a shared table and
+events refer to it by id. Options live in flat arrays: an event's rows run
+from ``option_starts[id]`` for ``option_counts[id]`` rows, already in
+display order. Rewards are collapsed to a single line when they are stored,
+so display code can use them as-is.
+
+Readers get a read-only view of an event's options that is built on first
+use and shared by every later lookup, so matching never copies options.
+"""
+
+from array import array
+from types import MappingProxyType
+
+
+def single_line(text):
+    """Join a multi-line reward into one line, the way the overlay shows it."""
+    return text.replace("\r\n", ", ").replace("\n", ", ").replace("\r", ", ")
+
+
+class EventStore:
+    """Append-only columns of event name, source and options.
+
+    Replacing an event's options appends fresh rows and repoints the event;
+    the old rows are left behind, which only matters for long hot-reload
+    sessions and is reset by the next full load.
+    """
+
+    def __init__(self):
+        self.strings = []
+        self.string_ids = {}
+        self.names = array("I")
+        self.sources = array("I")
+        self.option_starts = array("I")
+        self.option_counts = array("H")
+        self.option_labels = array("I")
+        self.option_rewards = array("I")
+        # Lazily built read-only option mappings, not cached
+        self.option_views = []
+
+    COLUMNS = (("names", "I"), ("sources", "I"), ("option_starts", "I"), ("option_counts", "H"),
+               ("option_labels", "I"), ("option_rewards", "I"))
+
+    def to_data(self):
+        """The columns as plain lists, for the JSON database cache."""
+        data = {"strings": self.strings}
+        for column, _ in self.COLUMNS:
+            data[column] = getattr(self, column).tolist()
+        return data
+
+    @classmethod
+    def from_data(cls, data):
+        store = cls()
+        store.strings = list(data["strings"])
+        store.string_ids = {text: string_id for string_id, text in enumerate(store.strings)}
+        for column, typecode in cls.COLUMNS:
+            setattr(store, column, array(typecode, data[column]))
+        store.option_views = [None] * len(store.names)
+        return store
+
+    def __len__(self):
+        return len(self.names)
+
+    def intern(self, text):
+        """Return the id of ``text`` in the string table, adding it if new."""
+        string_id = self.string_ids.get(text)
+        if string_id is None:
+            string_id = self.string_ids[text] = len(self.strings)
+            self.strings.append(text)
+        return string_id
+
+    def _append_options(self, options):
+        start = len(self.option_labels)
+        for label, reward in options.items():
+            self.option_labels.append(self.intern(label))
+            self.option_rewards.append(self.intern(single_line(reward)))
+        return start, len(options)
+
+    def append(self, name, source, options):
+        """Store one event and return its id."""
+        event_id = len(self.names)
+        self.names.append(self.intern(name))
+        self.sources.append(self.intern(source))
+        start, count = self._append_options(options)
+        self.option_starts.append(start)
+        self.option_counts.append(count)
+        self.option_views.append(None)
+        return event_id
+
+    def replace(self, event_id, source, options):
+        """Point an event at a new source and set of options."""
+        start, count = self._append_options(options)
+        self.sources[event_id] = self.intern(source)
+        self.option_starts[event_id] = start
+        self.option_counts[event_id] = count
+        self.option_views[event_id] = None
+
+    def name(self, event_id):
+        return self.strings[self.names[event_id]]
+
+    def source(self, event_id):
+        return self.strings[self.sources[event_id]]
+
+    def options(self, event_id):
+        """The event's options as a shared, read-only {label: single-line reward} mapping."""
+        view = self.option_views[event_id]
+        if view is None:
+            strings, labels, rewards = self.strings, self.option_labels, self.option_rewards
+            start = self.option_starts[event_id]
+            view = MappingProxyType({strings[labels[row]]: strings[rewards[row]]
+                                     for row in range(start, start + self.option_counts[event_id])})
+            self.option_views[event_id] = view
+        return view
@@ -0,0 +1,235 @@
+"""Template-matching OCR for the game's fixed event title font.
+
+Event titles are always rendered in the same font, size and colour, so once
+the title is binarized each character looks (nearly) the same every time.
+A title is split into glyphs at the empty columns between them, every glyph
+is normalized to a small fixed-size vector, and all of them are classified
+at once by correlation against a glyph atlas, a single matrix product.
+
+Glyphs are scaled against the full height of the title crop rather than
+the rows the title's ink happens to span, so a character keeps its size
+and its place relative to the baseline whether or not the title has
+ascenders or descenders ("a" and "o" differ in shape, not only in which
+rows they fill). The crop must therefore be the fixed event title region,
+not one trimmed to the text.
+
+The atlas is built offline from labelled title crops (``build_glyph_atlas.py``).
+Reads whose weakest glyph correlates poorly are reported with a low
+confidence, so the caller can fall back to Tesseract.
+"""
+
+import os
+
+import cv2
+import numpy as np
+
+from core.preprocess import text_mask
+
+GLYPH_ATLAS_PATH = "assets/ocr/glyph_atlas.npz"
+# Bumped whenever glyph normalization changes, so older atlases are rebuilt
+ATLAS_VERSION = 2
+
+# Normalized glyph size as (width, height)
+GLYPH_SIZE = (16, 24)
+# Glyph boxes are at least this wide relative to the crop height, so glyphs
+# keep their proportions instead of being stretched to the full width
+MIN_GLYPH_ASPECT = 0.75
+# Gap between glyphs, relative to the crop height, above which a space is assumed
+DEFAULT_SPACE_RATIO = 0.15
+# A glyph whose width differs from its character's by more than this fraction (or
+# WIDTH_TOLERANCE_PIXELS, whichever is larger) is two touching characters or a broken one
+MAX_WIDTH_MISMATCH = 0.3
+WIDTH_TOLERANCE_PIXELS = 2
+
+
+def segment_glyphs(binary):
+    """
+    Split a binarized one-line title into glyphs.
+
+    Return:
+        (line, spans): the text mask of the whole crop, and the [start, end)
+        column span of each glyph, left to right. ``line`` is None for a
+        blank crop.
+    """
+    line = text_mask(binary)
+    columns = line.any(axis=0).astype(np.int8)
+    if not columns.any():
+        return None, []
+    # Rising and falling edges of the inked columns delimit the glyphs
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], columns, [0]))))
+    return line, list(zip(edges[0::2], edges[1::2]))
+
+
+def glyph_vectors(line, spans):
+    """Normalize each glyph, at its height in the crop, to a zero-mean, unit-length GLYPH_SIZE vector."""
+    height = line.shape[0]
+    min_width = max(1, int(round(height * MIN_GLYPH_ASPECT)))
+    vectors = np.empty((len(spans), GLYPH_SIZE[0] * GLYPH_SIZE[1]), dtype=np.float32)
+    for i, (start, end) in enumerate(spans):
+        glyph = line[:, start:end]
+        width = end - start
+        if width < min_width:
+            # Centre narrow glyphs in a wider box
+            box = np.zeros((height, min_width), dtype=bool)
+            left = (min_width - width) // 2
+            box[:, left:left + width] = glyph
+            glyph = box
+        vectors[i] = cv2.resize(glyph.astype(np.float32), GLYPH_SIZE, interpolation=cv2.INTER_AREA).ravel()
+    vectors -= vectors.mean(axis=1, keepdims=True)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    vectors /= np.maximum(norms, 1e-6)
+    return vectors
+
+
+def word_breaks(line, spans, space_ratio):
+    """Indexes of the glyphs that start a new word."""
+    limit = line.shape[0] * space_ratio
+    return {i for i in range(1, len(spans)) if spans[i][0] - spans[i - 1][1] > limit}
+
+
+def calibrate_space_ratio(letter_gaps, word_gaps):
+    """
+    Gap threshold that misclassifies the fewest labelled gaps.
+
+    Kerning (a space before "T" or "A") makes some word gaps narrower than
+    the widest letter gaps, so the two ranges can overlap.
+    """
+    if not letter_gaps or not word_gaps:
+        return DEFAULT_SPACE_RATIO
+    letter_gaps = np.sort(np.asarray(letter_gaps, dtype=np.float32))
+    word_gaps = np.sort(np.asarray(word_gaps, dtype=np.float32))
+    thresholds = np.unique(np.concatenate((letter_gaps, word_gaps)))
+    # Gaps above the threshold are spaces
+    errors = (len(letter_gaps) - np.searchsorted(letter_gaps, thresholds, side="right")) \
+        + np.searchsorted(word_gaps, thresholds, side="right")
+    best = int(errors.argmin())
+    # Halfway to the next gap seen, for some margin either side
+    upper = thresholds[best + 1] if best + 1 < len(thresholds) else thresholds[best]
+    return float(thresholds[best] + upper) / 2
+
+
+class GlyphAtlas:
+    """
+    Reference vectors for every character seen in the training crops.
+
+    Args:
+        characters: The character of each row of ``vectors``.
+        vectors: (characters, GLYPH_SIZE area) normalized reference glyphs.
+        space_ratio: Glyph gap, relative to the crop height, that separates words.
+        widths: Mean width of each character relative to the crop height.
+    """
+
+    def __init__(self, characters, vectors, space_ratio=DEFAULT_SPACE_RATIO, widths=None):
+        self.characters = list(characters)
+        self.vectors = np.asarray(vectors, dtype=np.float32)
+        self.space_ratio = float(space_ratio)
+        self.widths = np.asarray(widths if widths is not None else np.zeros(len(self.characters)),
+                                 dtype=np.float32)
+
+    def __len__(self):
+        return len(self.characters)
+
+    @classmethod
+    def build(cls, samples):
+        """
+        Build an atlas from labelled binarized title crops.
+
+        Args:
+            samples: Iterable of (binary crop, title text).
+
+        Return:
+            (atlas, used, skipped): crops whose glyph count doesn't match the
+            label's non-space characters (touching or broken glyphs) are skipped.
+        """
+        sums = {}
+        width_sums = {}
+        counts = {}
+        letter_gaps = []
+        word_gaps = []
+        used = skipped = 0
+        for binary, title in samples:
+            line, spans = segment_glyphs(binary)
+            characters = title.replace(" ", "")
+            if line is None or len(spans) != len(characters):
+                skipped += 1
+                continue
+            used += 1
+            height = float(line.shape[0])
+            for character, vector, (start, end) in zip(characters, glyph_vectors(line, spans), spans):
+                sums[character] = sums.get(character, 0) + vector
+                width_sums[character] = width_sums.get(character, 0.0) + (end - start) / height
+                counts[character] = counts.get(character, 0) + 1
+            # Which gaps are spaces is known from the label, which calibrates the word break
+            words = title.split()
+            starts = set()
+            position = 0
+            for word in words[:-1]:
+                position += len(word)
+                starts.add(position)
+            for i in range(1, len(spans)):
+                gap = (spans[i][0] - spans[i - 1][1]) / height
+                (word_gaps if i in starts else letter_gaps).append(gap)
+
+        characters = sorted(sums)
+        vectors = np.array([sums[character] for character in characters], dtype=np.float32).reshape(
+            len(characters), GLYPH_SIZE[0] * GLYPH_SIZE[1])
+        vectors -= vectors.mean(axis=1, keepdims=True)
+        vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-6)
+
+        widths = [width_sums[character] / counts[character] for character in characters]
+        return cls(characters, vectors, calibrate_space_ratio(letter_gaps, word_gaps), widths), used, skipped
+
+    def save(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "wb") as f:
+            np.savez_compressed(f, characters=np.array(self.characters), vectors=self.vectors,
+                                space_ratio=np.float32(self.space_ratio), widths=self.widths,
+                                glyph_size=np.array(GLYPH_SIZE),
+                                version=np.int32(ATLAS_VERSION))
+
+    @classmethod
+    def load(cls, path):
+        """Load a saved atlas, or return None if it's missing or was built for another glyph format."""
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path) as data:
+                if "version" not in data or int(data["version"]) != ATLAS_VERSION \
+                        or tuple(data["glyph_size"]) != GLYPH_SIZE:
+                    print(f"[WARNING] Ignoring glyph atlas built for another glyph format, rebuild it: {path}")
+                    return None
+                return cls(data["characters"].tolist(), data["vectors"], float(data["space_ratio"]), data["widths"])
+        except (OSError, ValueError, KeyError) as e:
+            print(f"[WARNING] Ignoring unreadable glyph atlas: {e}")
+            return None
+
+
+class GlyphReader:
+    """Reads binarized titles with a GlyphAtlas."""
+
+    def __init__(self, atlas):
+        self.atlas = atlas
+
+    def read(self, binary):
+        """
+        Return (text, confidence): confidence is the correlation of the
+        least certain glyph (0-1), or 0.0 if nothing could be read or a
+        glyph is far wider or narrower than the character it matched.
+        """
+        line, spans = segment_glyphs(binary)
+        if line is None or not spans:
+            return "", 0.0
+        scores = glyph_vectors(line, spans) @ self.atlas.vectors.T
+        best = scores.argmax(axis=1)
+        height = line.shape[0]
+        widths = np.array([end - start for start, end in spans], dtype=np.float32)
+        expected = self.atlas.widths[best] * height
+        if np.any(np.abs(widths - expected) > np.maximum(expected * MAX_WIDTH_MISMATCH, WIDTH_TOLERANCE_PIXELS)):
+            return "", 0.0
+        confidence = float(scores[np.arange(len(spans)), best].min())
+        breaks = word_breaks(line, spans, self.atlas.space_ratio)
+        characters = self.atlas.characters
+        text = "".join((" " if i in breaks else "") + characters[index] for i, index in enumerate(best))
+        return text, max(0.0, confidence)
@@ -0,0 +1,98 @@
+"""Screen layout scaled from the 1920x1080 reference to the actual resolution.
+
+Every region, template and overlay position in the code is written for
+1920x1080. A Layout maps them to the detected game screen once: the 16:9
+game area is scaled uniformly and centred (letterboxed) inside the screen,
+and templates are resized to the native icon size up front, so matching
+runs on unscaled frames and nothing is resized per tick.
+"""
+
+import cv2
+
+from utils.match_template import to_grayscale
+from utils.screenshot import primary_monitor_bounds
+
+BASE_WIDTH = 1920
+BASE_HEIGHT = 1080
+
+# Scaled grayscale templates by (path, width, height), shared by every Layout
+_template_cache = {}
+
+
+class Layout:
+    """
+    Maps 1920x1080 reference coordinates onto a screen of another size.
+
+    Args:
+        width: Screen width in pixels.
+        height: Screen height in pixels.
+        left: Screen x coordinate of the screen's top-left corner.
+        top: Screen y coordinate of the screen's top-left corner.
+    """
+
+    def __init__(self, width=BASE_WIDTH, height=BASE_HEIGHT, left=0, top=0):
+        self.width = width
+        self.height = height
+        self.scale = min(width / BASE_WIDTH, height / BASE_HEIGHT)
+        # Centre the 16:9 game area on screens with another aspect ratio
+        self.offset_x = left + (width - BASE_WIDTH * self.scale) / 2
+        self.offset_y = top + (height - BASE_HEIGHT * self.scale) / 2
+
+    @classmethod
+    def detect(cls):
+        """Layout of the primary monitor, falling back to 1920x1080."""
+        try:
+            left, top, width, height = primary_monitor_bounds()
+        except Exception as e:
+            print(f"[WARNING] Could not detect the screen size, assuming 1920x1080: {e}")
+            return cls()
+        return cls(width, height, left, top)
+
+    def point(self, x, y):
+        """Scale a reference (x, y) to screen coordinates."""
+        return round(self.offset_x + x * self.scale), round(self.offset_y + y * self.scale)
+
+    def size(self, width, height):
+        """Scale a reference (width, height), never below one pixel."""
+        return max(1, round(width * self.scale)), max(1, round(height * self.scale))
+
+    def region(self, region):
+        """Scale a reference (x, y, width, height) region."""
+        x, y, width, height = region
+        return self.point(x, y) + self.size(width, height)
+
+    def relative(self, box):
+        """Scale a reference (dx, dy, width, height) box placed relative to another point, not the screen."""
+        dx, dy, width, height = box
+        return (round(dx * self.scale), round(dy * self.scale)) + self.size(width, height)
+
+    def regions(self, regions):
+        """Scale a mapping of region name to reference region."""
+        return {name: self.region(region) for name, region in regions.items()}
+
+    def detector_options(self):
+        """TemplateDetector settings that keep its coarse pass and ROI at the reference cost."""
+        return {"scale": min(1.0, 0.5 / self.scale), "roi_margin": max(1, round(16 * self.scale))}
+
+    def template(self, path):
+        """
+        Load a template and scale it to this resolution.
+
+        Return:
+            The grayscale template, or None if the file can't be read. Results are
+            cached per resolution, so switching back and forth never reloads.
+        """
+        key = (path, self.width, self.height)
+        if key not in _template_cache:
+            image = cv2.imread(path)
+            if image is not None:
+                image = to_grayscale(image)
+                if self.scale != 1.0:
+                    # Shrinking averages pixels like the game's own downscale; enlarging interpolates
+                    interpolation = cv2.INTER_AREA if self.scale < 1.0 else cv2.INTER_CUBIC
+                    image = cv2.resize(image, self.size(image.shape[1], image.shape[0]), interpolation=interpolation)
+            _template_cache[key] = image
+        return _template_cache[key]
+
+    def __repr__(self):
+        return f"Layout({self.width}x{self.height}, scale={self.scale:.3f})"
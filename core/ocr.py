@@ -4,6 +4,18 @@ import numpy as np
 import cv2
 import os
 import re
+import string
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+from core.glyph_ocr import GlyphAtlas, GlyphReader
+from core.preprocess import Preprocessor
+
+try:
+    import tesserocr
+except ImportError:  # Optional: falls back to the pytesseract subprocess
+    tesserocr = None
 
 # Configure Tesseract to use the custom trained data
 tessdata_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'tessdata')
@@ -15,46 +27,321 @@ arrow_pattern = re.compile(r'[❯»►▶▷]+')
 uppercase_pattern = re.compile(r'[A-Z]')
 valid_start_pattern = re.compile(r'^[#@A-Za-z0-9]')
 
-def extract_event_name_text(pil_img: Image.Image) -> str:
-    """Extract event name text from image using Tesseract OCR with white background preprocessing."""
+# Glyph reads whose least certain character correlates below this go to Tesseract instead
+GLYPH_MIN_CONFIDENCE = 0.8
+
+# The letters, digits and punctuation of the event names, ☆ and ♪, plus % which ☆ is often read as. Not every
+# character of every name: the (❯) markers are stripped anyway, and eng has no → (it reads ">"), katakana or 魂.
+# The "Letters → ..." chain still matches on its words; the one Japanese title can't be read by OCR at all.
+EVENT_NAME_WHITELIST = string.ascii_letters + string.digits + " !\"#%&'(),-./:?@☆♪"
+
+
+class TesseractEngine:
+    """Long-lived Tesseract handle configured once for single-line event names.
+
+    Loading eng.traineddata and forking the tesseract binary dominates a
+    pytesseract call on a 365x45 crop, so the API object is created once
+    and reused for every read.
+    """
+
+    def __init__(self, lang='eng', whitelist=EVENT_NAME_WHITELIST, user_words_path=None):
+        if tesserocr is None:
+            raise RuntimeError("tesserocr is not installed")
+        kwargs = {"lang": lang, "psm": tesserocr.PSM.SINGLE_LINE}
+        if os.path.isdir(tessdata_dir):
+            kwargs["path"] = tessdata_dir
+        if user_words_path:
+            # Decode against the event name vocabulary instead of the English dictionaries
+            kwargs["variables"] = {
+                "user_words_file": user_words_path,
+                "load_system_dawg": "0",
+                "load_freq_dawg": "0",
+            }
+        self.api = tesserocr.PyTessBaseAPI(**kwargs)
+        if whitelist:
+            self.api.SetVariable("tessedit_char_whitelist", whitelist)
+        self.lock = threading.Lock()
+
+    def recognize(self, binary: np.ndarray) -> str:
+        return self.recognize_with_confidence(binary)[0]
+
+    def recognize_with_confidence(self, binary: np.ndarray):
+        """Return the text and Tesseract's mean confidence (0-1)."""
+        binary = np.ascontiguousarray(binary)
+        height, width = binary.shape[:2]
+        with self.lock:
+            # Hand the pixels over directly instead of going through a PIL image
+            self.api.SetImageBytes(binary.tobytes(), width, height, 1, width)
+            return self.api.GetUTF8Text(), self.api.MeanTextConf() / 100.0
+
+    def close(self):
+        with self.lock:
+            self.api.End()
+
+
+_engine = None
+_engine_failed = False
+_user_words_path = None
+_glyph_reader = None
+# Which path answered each read, for benchmarks
+read_counts = {"glyph": 0, "tesseract": 0}
+
+
+def configure_vocabulary(words, path):
+    """Write the known event name words as a Tesseract user-words file.
+
+    Must be called before the first read; the shared engine then decodes
+    against this vocabulary.
+    """
+    global _user_words_path
     try:
-        # Convert PIL image to numpy array for preprocessing
-        img_np = np.array(pil_img)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n".join(words) + "\n")
+        _user_words_path = path
+    except OSError as e:
+        print(f"[WARNING] Could not write OCR vocabulary: {e}")
+
+
+def configure_glyph_atlas(path):
+    """Enable the glyph-template fast path with the atlas at ``path``, if it exists.
+
+    Return:
+        True if the atlas was loaded.
+    """
+    global _glyph_reader
+    atlas = GlyphAtlas.load(path)
+    _glyph_reader = GlyphReader(atlas) if atlas is not None and len(atlas) else None
+    return _glyph_reader is not None
+
+
+def get_tesseract_engine():
+    """Return the shared TesseractEngine, or None if it can't be created."""
+    global _engine, _engine_failed
+    if _engine is None and not _engine_failed:
+        try:
+            _engine = TesseractEngine(user_words_path=_user_words_path)
+        except Exception as e:
+            _engine_failed = True
+            print(f"[INFO] Persistent Tesseract engine unavailable, using pytesseract: {e}")
+    return _engine
+
+
+def to_ocr_grayscale(img) -> np.ndarray:
+    """Convert a PIL image (RGB) or a NumPy array (OpenCV BGR/BGRA or grayscale) to grayscale."""
+    if isinstance(img, np.ndarray):
+        if img.ndim == 2:
+            return img
+        if img.shape[2] == 4:
+            return cv2.cvtColor(img, cv2.COLOR_BGRA2GRAY)
+        return cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+
+    # Convert PIL image to numpy array for preprocessing
+    img_np = np.array(img)
+    if len(img_np.shape) == 3:
+        return cv2.cvtColor(img_np, cv2.COLOR_RGB2GRAY)
+    return img_np
+
+
+def binarize_event_image(pil_img) -> np.ndarray:
+    """Apply the white background preprocessing used for event names."""
+    gray = to_ocr_grayscale(pil_img)
+
+    # Create white background by inverting and thresholding
+    # This helps with text that might be on dark backgrounds
+    _, binary = cv2.threshold(gray, 200, 255, cv2.THRESH_BINARY)
+    return binary
+
+
+def clean_event_text(text: str) -> str:
+    """Strip OCR artifacts from a raw event name read."""
+    # Basic cleanup
+    text = text.strip()
+    # Don't remove parentheses - they're important for events like "At Summer Camp (Year 2)"
+    # text = re.sub(r'[()]+', '', text)  # Remove parentheses
+
+    # Remove common OCR artifacts
+    text = arrow_pattern.sub('', text)  # Remove arrow symbols
 
-        # Apply white background preprocessing
-        if len(img_np.shape) == 3:
-            # Convert to grayscale
-            gray = cv2.cvtColor(img_np, cv2.COLOR_RGB2GRAY)
-        else:
-            gray = img_np
+    # Smarter filtering with valid_start_pattern
+    if not valid_start_pattern.match(text):
+        # Remove everything before the first uppercase letter
+        match = uppercase_pattern.search(text)
+        if match:
+            text = text[match.start():]
 
-        # Create white background by inverting and thresholding
-        # This helps with text that might be on dark backgrounds
-        _, binary = cv2.threshold(gray, 200, 255, cv2.THRESH_BINARY)
+    return text.strip()
 
+
+def read_event_name(binary: np.ndarray) -> str:
+    """Run Tesseract on an already binarized event name image."""
+    return read_event_name_with_confidence(binary)[0]
+
+
+def read_event_name_with_confidence(binary: np.ndarray):
+    """Return the cleaned read and the OCR confidence in it (0-1).
+
+    The glyph atlas is tried first when configured; Tesseract only runs when
+    it isn't confident. The pytesseract fallback doesn't report a confidence
+    and returns None.
+    """
+    if _glyph_reader is not None:
+        try:
+            text, confidence = _glyph_reader.read(binary)
+            if confidence >= GLYPH_MIN_CONFIDENCE:
+                read_counts["glyph"] += 1
+                return clean_event_text(text), confidence
+        except Exception as e:
+            print(f"[WARNING] Glyph OCR failed, using Tesseract: {e}")
+
+    read_counts["tesseract"] += 1
+    engine = get_tesseract_engine()
+    if engine is not None:
+        try:
+            text, confidence = engine.recognize_with_confidence(binary)
+            return clean_event_text(text), confidence
+        except Exception as e:
+            print(f"[WARNING] Persistent Tesseract engine failed, using pytesseract: {e}")
+
+    try:
         # Convert back to PIL for OCR
         processed_img = Image.fromarray(binary)
 
         # Use the processed image for OCR
         text = pytesseract.image_to_string(processed_img, lang='eng')
+        return clean_event_text(text), None
 
-        # Basic cleanup
-        text = text.strip()
-        # Don't remove parentheses - they're important for events like "At Summer Camp (Year 2)"
-        # text = re.sub(r'[()]+', '', text)  # Remove parentheses
-
-        # Remove common OCR artifacts
-        text = arrow_pattern.sub('', text)  # Remove arrow symbols
+    except Exception as e:
+        print(f"[WARNING] Event name OCR extraction failed: {e}")
+        return "", None
 
-        # Smarter filtering with valid_start_pattern
-        if not valid_start_pattern.match(text):
-            # Remove everything before the first uppercase letter
-            match = uppercase_pattern.search(text)
-            if match:
-                text = text[match.start():]
 
-        return text.strip()
+def extract_event_name_text(pil_img) -> str:
+    """Extract event name text from image using Tesseract OCR with white background preprocessing.
 
+    Accepts a PIL image or a NumPy array as returned by CapturedFrame.view().
+    """
+    try:
+        binary = binarize_event_image(pil_img)
     except Exception as e:
         print(f"[WARNING] Event name OCR extraction failed: {e}")
         return ""
+    return read_event_name(binary)
+
+
+# Shared memory blocks attached by this worker process, by name
+_worker_blocks = {}
+# Worker preprocessors by their options
+_worker_preprocessors = {}
+
+
+def _init_worker():
+    """Pool worker: read with a plain engine, without the event title configuration."""
+    global _engine, _engine_failed, _user_words_path, _glyph_reader
+    # Forked workers inherit the parent's engine, vocabulary and glyph atlas; none of them fit other text
+    _engine, _engine_failed, _user_words_path, _glyph_reader = None, False, None, None
+
+
+def _recognize_shared_crop(block_name, offset, shape, preprocess_options):
+    """Pool worker: read one crop out of the shared block and OCR it."""
+    block = _worker_blocks.get(block_name)
+    if block is None:
+        # Only the newest block stays attached; older ones have been released by the parent
+        for stale in _worker_blocks.values():
+            stale.close()
+        _worker_blocks.clear()
+        block = _worker_blocks[block_name] = shared_memory.SharedMemory(name=block_name)
+    crop = np.ndarray(shape, dtype=np.uint8, buffer=block.buf, offset=offset)
+    key = tuple(sorted(preprocess_options.items()))
+    preprocessor = _worker_preprocessors.get(key)
+    if preprocessor is None:
+        preprocessor = _worker_preprocessors[key] = Preprocessor(**preprocess_options)
+    binary = preprocessor(crop)
+    return read_event_name_with_confidence(binary)
+
+
+class OcrPool:
+    """Recognizes a batch of named crops in parallel worker processes.
+
+    Crops are copied once into a shared memory block that the workers map
+    directly, so only offsets and shapes cross the process boundary. Each
+    worker keeps its own Tesseract engine without the event name vocabulary
+    or glyph atlas, since the pool reads the other text on screen (option
+    labels, the date); event titles stay on the in-process path.
+
+    A pool is used from one thread: ``submit`` a batch, do other work while
+    the workers read it, then collect it with ``results`` before submitting
+    the next one. Call ``close`` when done.
+    """
+
+    def __init__(self, workers=None):
+        if workers is None:
+            workers = max(1, min(4, (os.cpu_count() or 2) - 1))
+        self.executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+        self.block = None
+        self.futures = None
+
+    def _ensure_block(self, size):
+        if self.block is None or self.block.size < size:
+            if self.block is not None:
+                self.block.close()
+                self.block.unlink()
+            self.block = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        return self.block
+
+    def submit(self, crops, preprocess_options=None):
+        """
+        Start reading several crops at once.
+
+        Args:
+            crops: Mapping of region name to a uint8 image (grayscale, BGR or BGRA).
+            preprocess_options: Optional {region name: Preprocessor keyword arguments};
+                regions without an entry use the Preprocessor defaults.
+        """
+        if self.futures is not None:
+            raise RuntimeError("The previous batch hasn't been collected")
+        preprocess_options = preprocess_options or {}
+        arrays = {name: np.ascontiguousarray(crop, dtype=np.uint8) for name, crop in crops.items()}
+        self.futures = {}
+        if not arrays:
+            return
+        try:
+            block = self._ensure_block(sum(array.nbytes for array in arrays.values()))
+            offset = 0
+            for name, array in arrays.items():
+                np.ndarray(array.shape, dtype=np.uint8, buffer=block.buf, offset=offset)[...] = array
+                self.futures[name] = self.executor.submit(_recognize_shared_crop, block.name, offset, array.shape,
+                                                          preprocess_options.get(name, {}))
+                offset += array.nbytes
+        except Exception:
+            # Wait for whatever was submitted so the block can be reused
+            self.results()
+            raise
+
+    def results(self):
+        """
+        Wait for the submitted batch.
+
+        Return:
+            {name: (text, confidence)}, confidence is None when Tesseract didn't report one.
+        """
+        futures, self.futures = self.futures or {}, None
+        results = {}
+        for name, future in futures.items():
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                print(f"[WARNING] OCR of {name} failed: {e}")
+                results[name] = ("", None)
+        return results
+
+    def recognize_batch(self, crops, preprocess_options=None):
+        """OCR several crops at once; see ``submit`` and ``results``."""
+        self.submit(crops, preprocess_options)
+        return self.results()
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        if self.block is not None:
+            self.block.close()
+            self.block.unlink()
+            self.block = None
@@ -0,0 +1,88 @@
+"""LRU cache of OCR results keyed by a perceptual hash of the title crop.
+
+The same few hundred event banners recur run after run, so once a banner
+has been read the binarized crop's hash maps straight to the cleaned text
+and the events it resolved to, and Tesseract never has to run for it again.
+"""
+
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+# Hash grid: wide enough to keep individual glyphs apart on a one-line title
+HASH_SIZE = (96, 12)
+
+
+def image_hash(binary):
+    """Perceptual hash of a binarized image, as a hex string."""
+    small = cv2.resize(binary, HASH_SIZE, interpolation=cv2.INTER_AREA)
+    bits = small > 127
+    return np.packbits(bits).tobytes().hex()
+
+
+class OcrCache:
+    """Bounded LRU mapping image hash -> (text, [(event name, score), ...]).
+
+    The OCR stage reads it while the lookup stage adds to it, so every
+    access holds ``lock``.
+    """
+
+    def __init__(self, max_size=512, path=None):
+        self.max_size = max_size
+        self.path = path
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        """Return the cached (text, events) for a hash, or None."""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, text, events):
+        with self.lock:
+            self.entries[key] = (text, list(events))
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def load(self):
+        """Load persisted entries, oldest first, if a path is configured."""
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[WARNING] Ignoring unreadable OCR cache: {e}")
+            return
+        for key, text, events in data.get("entries", []):
+            self.put(key, text, [tuple(event) for event in events])
+
+    def save(self):
+        """Persist the entries, least recently used first, if a path is configured."""
+        if not self.path:
+            return
+        with self.lock:
+            data = {"entries": [[key, text, events] for key, (text, events) in self.entries.items()]}
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"[WARNING] Could not write OCR cache: {e}")
@@ -0,0 +1,124 @@
+"""Incremental rendering of the overlay widgets.
+
+Each matched event's text block (source, options and option count) is
+formatted once and reused every time the event is shown again. The best
+match also lists the option labels read off the buttons next to its
+options. The renderer
+remembers what each widget currently displays and only calls into Tk when
+the new content differs, so repeated status messages and the same event
+staying on screen cost a string comparison instead of widget updates. Tk
+calls and render time are counted for the stats panel.
+"""
+
+import tkinter as tk
+
+
+def format_event_block(source, options, option_labels=()):
+    """The options text shown for one matched event.
+
+    ``option_labels`` are the button labels on screen, top to bottom; they are
+    only shown when there is one per option.
+    """
+    lines = [f"📍 Source: {source}", "🎯 Options:"]
+    if options:
+        if len(option_labels) != len(options):
+            option_labels = [""] * len(options)
+        for (option_name, option_reward), label in zip(options.items(), option_labels):
+            if label:
+                option_name = f"{option_name} ({label})"
+            # Rewards are stored single-line already
+            lines.append(f"   {option_name}: {option_reward}")
+        lines.append("")
+        lines.append(f"📊 Total options: {len(options)}")
+    else:
+        lines.append("   No valid options found")
+    return "\n".join(lines) + "\n"
+
+
+class OverlayRenderer:
+    """
+    Owns the event name label, options text and status label of the overlay.
+
+    Args:
+        event_name_label: ttk.Label showing the matched event name.
+        options_text: tk.Text showing the options of the matched events.
+        status_label: ttk.Label showing the pipeline status.
+        perf: PerfStats receiving a "render" span per update.
+    """
+
+    def __init__(self, event_name_label, options_text, status_label, perf):
+        self.event_name_label = event_name_label
+        self.options_text = options_text
+        self.status_label = status_label
+        self.perf = perf
+        # What each widget shows right now
+        self.shown = {}
+        # event name -> (source, options view, option labels, formatted block)
+        self.blocks = {}
+        self.updates = 0
+        self.unchanged = 0
+        self.tk_calls = 0
+
+    def event_block(self, event_name, event_data, option_labels=()):
+        """Formatted block for a matched event, built once per event, options view and labels."""
+        source, options = event_data["source"], event_data["options"]
+        option_labels = tuple(option_labels)
+        cached = self.blocks.get(event_name)
+        # Options views are shared and replaced on reload, so identity tells whether the block is current
+        if cached is not None and cached[0] == source and cached[1] is options and cached[2] == option_labels:
+            return cached[3]
+        block = format_event_block(source, options, option_labels)
+        self.blocks[event_name] = (source, options, option_labels, block)
+        return block
+
+    def _set_label(self, key, label, text, color):
+        if self.shown.get(key) == (text, color):
+            return False
+        label.config(text=text, foreground=color)
+        self.shown[key] = (text, color)
+        self.tk_calls += 1
+        return True
+
+    def _set_options(self, text):
+        if self.shown.get("options") == text:
+            return False
+        self.options_text.delete(1.0, tk.END)
+        self.options_text.insert(tk.END, text)
+        self.shown["options"] = text
+        self.tk_calls += 2
+        return True
+
+    def _count(self, changed):
+        if changed:
+            self.updates += 1
+        else:
+            self.unchanged += 1
+
+    def render_status(self, text, color):
+        with self.perf.span("render"):
+            self._count(self._set_label("status", self.status_label, text, color))
+
+    def render_event(self, event_name, found_events, option_labels=()):
+        """Show the matches of an OCR read, or the unknown event message if there are none."""
+        with self.perf.span("render"):
+            if found_events:
+                title = f"📋 {next(iter(found_events))}"
+                # The labels on screen belong to the best match only
+                text = "".join(self.event_block(name, data, option_labels if index == 0 else ())
+                               for index, (name, data) in enumerate(found_events.items()))
+                status = ("✅ Event found!", '#28A745')
+            else:
+                title = f"❓ {event_name}"
+                text = f"❌ Unknown event - not found in database\nSearched for: '{event_name}'\n"
+                status = ("❌ Unknown event", '#DC3545')
+            changed = self._set_label("event_name", self.event_name_label, title, '#A23B72')
+            changed = self._set_options(text) or changed
+            changed = self._set_label("status", self.status_label, *status) or changed
+            self._count(changed)
+
+    def summary(self):
+        """Return (updates that changed a widget, updates skipped as unchanged, Tk calls)."""
+        return self.updates, self.unchanged, self.tk_calls
+
+    def format_summary(self):
+        return f"render: {self.updates} updates, {self.unchanged} unchanged, {self.tk_calls} Tk calls"
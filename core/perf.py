@@ -0,0 +1,107 @@
+"""Lightweight timing spans for the hot path.
+
+Spans are only recorded while stats are enabled (the stats panel is open or
+a log file is configured); otherwise ``span`` hands back a shared no-op
+context manager, so the instrumentation costs one attribute check.
+"""
+
+import json
+import math
+import threading
+import time
+from collections import deque
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct / 100.0 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("stats", "name", "started")
+
+    def __init__(self, stats, name):
+        self.stats = stats
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.stats.record(self.name, time.perf_counter() - self.started)
+        return False
+
+
+class PerfStats:
+    """Rolling per-span latency windows, safe to record into from any thread."""
+
+    def __init__(self, window=256):
+        self.window = window
+        self.enabled = False
+        self.samples = {}
+        self.lock = threading.Lock()
+
+    def span(self, name):
+        """Context manager timing one occurrence of ``name``."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name)
+
+    def record(self, name, seconds):
+        samples = self.samples.get(name)
+        if samples is None:
+            with self.lock:
+                samples = self.samples.setdefault(name, deque(maxlen=self.window))
+        samples.append(seconds)
+
+    def reset(self):
+        with self.lock:
+            self.samples = {}
+
+    def summary(self):
+        """Return {span: {count, p50_ms, p90_ms, p99_ms, max_ms}} over the rolling window."""
+        with self.lock:
+            items = list(self.samples.items())
+        summary = {}
+        for name, samples in items:
+            values = list(samples)
+            summary[name] = {
+                "count": len(values),
+                "p50_ms": percentile(values, 50) * 1000,
+                "p90_ms": percentile(values, 90) * 1000,
+                "p99_ms": percentile(values, 99) * 1000,
+                "max_ms": max(values, default=0.0) * 1000,
+            }
+        return summary
+
+    def format_summary(self):
+        """Render the summary as a fixed-width table."""
+        lines = [f"{'span':<12}{'n':>5}{'p50':>8}{'p90':>8}{'p99':>8}{'max':>8}"]
+        for name, stats in sorted(self.summary().items()):
+            lines.append(f"{name:<12}{stats['count']:>5}{stats['p50_ms']:>8.1f}{stats['p90_ms']:>8.1f}"
+                         f"{stats['p99_ms']:>8.1f}{stats['max_ms']:>8.1f}")
+        return "\n".join(lines)
+
+    def write_log(self, path):
+        """Append the current summary as one JSON line."""
+        try:
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"time": time.time(), "spans": self.summary()}) + "\n")
+        except OSError as e:
+            print(f"[WARNING] Could not write performance log: {e}")
@@ -0,0 +1,567 @@
+"""Threaded capture → detect → OCR → lookup pipeline.
+
+Every stage runs in its own daemon thread and hands its output to the next
+one through a bounded queue. When a consumer falls behind, the stale item
+is dropped in favour of the newest one, so the pipeline always works on the
+latest frame. The Tk thread only drains ``ui_messages`` and updates widgets.
+
+While the OCR stage reads an event title, an ``OcrPool`` reads the in-game
+date and the option button labels in worker processes, so the extra text
+costs no more wall time than the slowest crop.
+"""
+
+import collections
+import queue
+import threading
+import time
+
+from core.ocr import OcrPool, read_event_name_with_confidence
+from core.ocr_cache import OcrCache, image_hash
+from core.perf import PerfStats
+from core.preprocess import Preprocessor
+from core.scheduler import AdaptiveScheduler
+from core.session_log import KIND_EVENT, KIND_SUPPORT, SessionLog
+from core.text_presence import TextPresenceGate
+from utils.frame_change import ChangeDetector
+from utils.match_template import TemplateDetector
+from utils.screenshot import CaptureSession
+
+# Regions at 1920x1080 as (x, y, width, height); core.layout scales them to other resolutions
+EVENT_REGION = (240, 200, 365, 45)
+LEFT_SCREEN_REGION = (0, 0, 1920//2, 1080)
+SUPPORT_CARD_EVENT_REGION = (240, 160, 200, 70)
+# In-game date above the turn counter, e.g. "Junior Year Pre-Debut"
+DATE_REGION = (258, 34, 160, 24)
+# Option button label as (dx, dy, width, height) from its icon, which is what the event template matches;
+# the buttons are stacked OPTION_PITCH pixels apart
+OPTION_LABEL_BOX = (45, 0, 460, 41)
+OPTION_PITCH = 112
+MAX_OPTION_BUTTONS = 5
+# Pixels searched around the expected position of each further button icon
+OPTION_ICON_MARGIN = 8
+# The date is dark text with a white outline on a light pill; only a low cut keeps the outline out
+SCREEN_TEXT_PREPROCESS = {"date": {"threshold": "fixed", "fixed_threshold": 110}}
+
+EVENT_TEMPLATE_PATH = "assets/icons/event_choice_1.png"
+SUPPORT_CARD_EVENT_TEMPLATE_PATH = "assets/icons/support_card_event.png"
+
+# UI message kinds
+UI_STATUS = "status"
+UI_RAISE = "raise"
+UI_LOWER = "lower"
+UI_EVENT = "event"
+UI_SUPPORT_EVENT = "support_event"
+
+# Reads whose best in-vocabulary match scores lower than this are rejected
+MIN_MATCH_CONFIDENCE = 0.6
+# After this many rejected reads of one event the read is shown as unknown anyway
+MAX_REJECTED_READS = 3
+# After this many title checks in a row without settled text the title is read anyway (~1s at the alert interval)
+MAX_SKIPPED_TITLE_CHECKS = 20
+
+
+def put_latest(target_queue, item):
+    """Put an item on a bounded queue, dropping the oldest entry if it is full.
+
+    Returns True if an item had to be dropped.
+    """
+    dropped = False
+    while True:
+        try:
+            target_queue.put_nowait(item)
+            return dropped
+        except queue.Full:
+            try:
+                target_queue.get_nowait()
+                dropped = True
+            except queue.Empty:
+                pass
+
+
+class UiMessages:
+    """
+    Messages from the pipeline threads to the Tk thread, oldest first.
+
+    Each status line only matters until the next one, so consecutive status
+    messages are coalesced into one slot. Every other message is queued in
+    order behind the status that preceded it. The queue is bounded: once the
+    Tk thread is ``maxlen`` messages behind, the oldest is dropped. Each
+    message kind describes the latest state (event shown, overlay raised,
+    tracker changed), so a newer message has already superseded it.
+
+    Args:
+        maxlen: Most messages kept besides the latest status.
+    """
+
+    def __init__(self, maxlen=64):
+        self.lock = threading.Lock()
+        self.messages = collections.deque(maxlen=maxlen)
+        self.status = None
+        # Status messages coalesced away and messages dropped from a full queue
+        self.dropped = 0
+
+    def _append(self, message):
+        if len(self.messages) == self.messages.maxlen:
+            self.dropped += 1
+        self.messages.append(message)
+
+    def put(self, kind, args):
+        with self.lock:
+            if kind == UI_STATUS:
+                if self.status is not None:
+                    self.dropped += 1
+                self.status = (kind, args)
+                return
+            if self.status is not None:
+                self._append(self.status)
+                self.status = None
+            self._append((kind, args))
+
+    def drain(self):
+        """Take every pending (kind, args) message, oldest first."""
+        with self.lock:
+            pending = list(self.messages)
+            self.messages.clear()
+            if self.status is not None:
+                pending.append(self.status)
+                self.status = None
+        return pending
+
+
+class Frame:
+    """One tick's screen grab, plus what later stages learned about it."""
+
+    def __init__(self, timestamp, capture):
+        self.timestamp = timestamp
+        self.capture = capture
+        self.event_icon = False
+        self.event_icon_location = None
+        self.event_icon_score = -1.0
+        self.support_card_event = False
+        self.support_card_event_score = -1.0
+        self.ocr_key = None
+        self.ocr_confidence = None
+        self.game_date = ""
+        self.option_labels = ()
+        self.cached_events = None
+        self.generation = 0
+        self.event_name = ""
+        # Milliseconds spent in each stage, by stage name
+        self.stage_ms = {}
+
+
+class EventPipeline:
+    """Runs event detection in worker threads and reports to the UI through ``ui_messages``."""
+
+    def __init__(self, event_index, event_template, support_card_event_template,
+                 left_screen_region, support_card_event_region, event_region,
+                 stability_delay=0.05, ui_queue_size=64, ocr_cache_path=None, perf=None, scheduler=None,
+                 preprocessor=None, detector_options=None, session_log=None, date_region=None,
+                 option_label_box=None, option_pitch=OPTION_PITCH):
+        self.event_index = event_index
+        self.perf = perf if perf is not None else PerfStats()
+        detector_options = detector_options or {}
+        self.event_detector = TemplateDetector(event_template, threshold=0.8, **detector_options)
+        self.support_card_event_detector = None
+        if support_card_event_template is not None:
+            self.support_card_event_detector = TemplateDetector(support_card_event_template, threshold=0.8,
+                                                                **detector_options)
+        self.left_screen_region = left_screen_region
+        self.support_card_event_region = support_card_event_region
+        self.event_region = event_region
+        # The date and option labels are read in a process pool alongside the title, if any are configured
+        self.date_region = date_region
+        self.option_label_box = option_label_box
+        self.option_pitch = option_pitch
+        self.option_icon_margin = max(1, round(OPTION_ICON_MARGIN * option_pitch / OPTION_PITCH))
+        self.ocr_pool = None
+        self.scheduler = scheduler if scheduler is not None else AdaptiveScheduler()
+        # Only the OCR thread uses the preprocessor, so its buffers are never shared
+        self.preprocessor = preprocessor if preprocessor is not None else Preprocessor(perf=self.perf)
+        self.stability_delay = stability_delay
+
+        self.detect_queue = queue.Queue(maxsize=1)
+        self.ocr_queue = queue.Queue(maxsize=1)
+        self.lookup_queue = queue.Queue(maxsize=1)
+        self.ui_messages = UiMessages(maxlen=ui_queue_size)
+        self.dropped_frames = 0
+
+        # Unchanged pixels reuse the previous detection / OCR result
+        self.frame_changes = ChangeDetector()
+        self.ocr_changes = ChangeDetector()
+        self.last_detection = None
+        self.last_ocr = None
+        # Set by the lookup stage when a read was rejected; the OCR stage then drops its last read
+        self.reread_requested = threading.Event()
+        self.ocr_cache = OcrCache(path=ocr_cache_path)
+        # Every shown event and tracked support event, persisted across runs
+        self.session_log = session_log if session_log is not None else SessionLog()
+        # OCR waits until the title crop holds settled text
+        self.text_gate = TextPresenceGate(max_skips=MAX_SKIPPED_TITLE_CHECKS)
+        self.text_gate_generation = None
+
+        # Detection state, shared by the detect and lookup stages
+        self.state_lock = threading.Lock()
+        self.event_detection_start = None
+        self.event_displayed = False
+        self.last_event_name = None
+        self.ocr_pending = False
+        self.event_visible = False
+        # Bumped whenever the event disappears so in-flight reads can be discarded
+        self.generation = 0
+        self.rejected_reads = 0
+        self.tracked_support_events = set()
+
+        self.stop_event = threading.Event()
+        self.threads = []
+
+    def start(self):
+        self.ocr_cache.load()
+        self.session_log.open()
+        if self.date_region is not None or self.option_label_box is not None:
+            try:
+                self.ocr_pool = OcrPool()
+            except Exception as e:
+                print(f"[WARNING] OCR pool unavailable, reading event titles only: {e}")
+        stages = [
+            ("capture", self.capture_loop),
+            ("detect", lambda: self.stage_loop("detect", self.detect_queue, self.detect_stage)),
+            ("ocr", lambda: self.stage_loop("ocr", self.ocr_queue, self.ocr_stage)),
+            ("lookup", lambda: self.stage_loop("lookup", self.lookup_queue, self.lookup_stage)),
+        ]
+        for name, target in stages:
+            thread = threading.Thread(target=target, name=f"event-pipeline-{name}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def stop(self, timeout=1.0):
+        self.stop_event.set()
+        for thread in self.threads:
+            thread.join(timeout)
+        self.threads = []
+        if self.ocr_pool is not None:
+            self.ocr_pool.close()
+            self.ocr_pool = None
+        self.ocr_cache.save()
+        print(f"   ✓ OCR cache: {self.ocr_cache.hits} hits, {self.ocr_cache.misses} misses")
+        (find_hits, find_misses), _ = self.event_index.cache_summary()
+        print(f"   ✓ Match cache: {find_hits} hits, {find_misses} misses")
+        print(f"   ✓ Polling ticks by state: {self.scheduler.summary()}")
+        for name, (skipped, checked) in {**self.frame_changes.summary(), **self.ocr_changes.summary()}.items():
+            print(f"   ✓ {name}: skipped {skipped} of {checked} unchanged ticks")
+        read, forced, no_text, unsettled = self.text_gate.summary()
+        print(f"   ✓ Title checks: {read} read, {forced} read after waiting too long, {no_text} without text, "
+              f"{unsettled} still settling")
+        detections, unmatched, latency = self.session_log.run_summary()
+        if detections:
+            print(f"   ✓ Session log: {detections} detections, {unmatched} unmatched, "
+                  f"{latency:.0f}ms mean capture-to-decision latency")
+        self.session_log.close()
+
+    def clear_tracked_events(self):
+        with self.state_lock:
+            self.tracked_support_events.clear()
+
+    def emit(self, kind, *args):
+        self.ui_messages.put(kind, args)
+
+    def forward(self, target_queue, frame):
+        if put_latest(target_queue, frame):
+            self.dropped_frames += 1
+
+    def capture_loop(self):
+        regions = {
+            "left_screen": self.left_screen_region,
+            "support_card_event": self.support_card_event_region,
+            "event": self.event_region,
+        }
+        if self.date_region is not None:
+            regions["date"] = self.date_region
+        session = CaptureSession(regions)
+        try:
+            while not self.stop_event.is_set():
+                started = time.monotonic()
+                try:
+                    with self.perf.span("capture"):
+                        capture = session.grab()
+                    self.forward(self.detect_queue, Frame(time.time(), capture))
+                except Exception as e:
+                    self.emit(UI_STATUS, f"❌ Error: {str(e)}", '#DC3545')
+                elapsed = time.monotonic() - started
+                self.scheduler.add_work(elapsed)
+                self.stop_event.wait(max(0.0, self.scheduler.next_interval() - elapsed))
+        finally:
+            session.close()
+
+    def stage_loop(self, name, input_queue, handler):
+        while not self.stop_event.is_set():
+            try:
+                frame = input_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            started = time.monotonic()
+            try:
+                handler(frame)
+            except Exception as e:
+                with self.state_lock:
+                    self.ocr_pending = False
+                self.emit(UI_STATUS, f"❌ Error: {str(e)}", '#DC3545')
+            elapsed = time.monotonic() - started
+            frame.stage_ms[name] = elapsed * 1000
+            self.scheduler.add_work(elapsed)
+
+    def detect_stage(self, frame):
+        left_changed = self.frame_changes.changed("left_screen", frame.capture.view("left_screen", "bgra"))
+        support_changed = self.frame_changes.changed("support_card_event", frame.capture.view("support_card_event", "bgra"))
+        if left_changed or support_changed or self.last_detection is None:
+            with self.perf.span("match"):
+                self.detect_templates(frame)
+            self.last_detection = (frame.event_icon, frame.event_icon_location, frame.event_icon_score,
+                                   frame.support_card_event, frame.support_card_event_score)
+        else:
+            (frame.event_icon, frame.event_icon_location, frame.event_icon_score,
+             frame.support_card_event, frame.support_card_event_score) = self.last_detection
+        self.update_detection_state(frame)
+
+        scores = [(frame.event_icon_score, self.event_detector.threshold)]
+        if self.support_card_event_detector is not None:
+            scores.append((frame.support_card_event_score, self.support_card_event_detector.threshold))
+        self.scheduler.observe(scores, frame.event_icon or frame.support_card_event, self.event_displayed)
+
+    def detect_templates(self, frame):
+        frame.event_icon_location, frame.event_icon_score = self.event_detector.detect(frame.capture.view("left_screen", "gray"))
+        frame.event_icon = frame.event_icon_location is not None
+        if self.support_card_event_detector is not None:
+            support_image = frame.capture.view("support_card_event", "gray")
+            location, frame.support_card_event_score = self.support_card_event_detector.detect(support_image)
+            frame.support_card_event = location is not None
+
+    def update_detection_state(self, frame):
+        with self.state_lock:
+            if frame.event_icon or frame.support_card_event:
+                if not self.event_visible:
+                    self.event_visible = True
+                    self.emit(UI_RAISE)
+                if self.event_detection_start is None:
+                    self.event_detection_start = frame.timestamp
+                    if not self.event_displayed:
+                        if frame.support_card_event:
+                            self.emit(UI_STATUS, "👁️ Support event detected, waiting for stability...", '#FFC107')
+                        else:  # event_icon only
+                            self.emit(UI_STATUS, "👁️ Event icon detected, waiting for stability...", '#FFC107')
+                if not self.event_displayed and not self.ocr_pending:
+                    time_present = frame.timestamp - self.event_detection_start
+                    if time_present >= self.stability_delay:
+                        self.emit(UI_STATUS, "✅ Processing event...", '#17A2B8')
+                        self.ocr_pending = True
+                        frame.generation = self.generation
+                        self.forward(self.ocr_queue, frame)
+            else:
+                if self.event_visible:
+                    self.event_visible = False
+                    self.generation += 1
+                    self.rejected_reads = 0
+                    self.emit(UI_LOWER)
+                if self.event_displayed:
+                    self.event_displayed = False
+                    self.last_event_name = None
+                    self.emit(UI_STATUS, "🔄 Waiting for next event...", '#6C757D')
+                elif self.event_detection_start:
+                    self.emit(UI_STATUS, "❌ Event disappeared too quickly", '#DC3545')
+                self.event_detection_start = None
+                self.ocr_pending = False
+
+    def text_settled(self, frame, binary):
+        """Whether the title is fully rendered; otherwise hands the next frame back to detection."""
+        if frame.generation != self.text_gate_generation:
+            self.text_gate.reset()
+            self.text_gate_generation = frame.generation
+        with self.perf.span("presence"):
+            reason = self.text_gate.check(binary)
+        if reason is None:
+            return True
+        # Make sure the next frame is checked again rather than reusing an older read
+        self.ocr_changes.reset("event")
+        with self.state_lock:
+            self.ocr_pending = False
+        return False
+
+    def ocr_stage(self, frame):
+        if self.reread_requested.is_set():
+            self.reread_requested.clear()
+            self.ocr_changes.reset("event")
+            self.last_ocr = None
+        event_image = frame.capture.view("event", "bgra")
+        if self.ocr_changes.changed("event", event_image) or self.last_ocr is None:
+            binary = self.preprocessor(event_image)
+            if not self.text_settled(frame, binary):
+                return
+            key = image_hash(binary)
+            # The pool reads the date and option labels while this thread reads the title
+            option_count = self.submit_screen_text(frame) if self.ocr_pool is not None else None
+            try:
+                cached = self.ocr_cache.get(key)
+                if cached is not None:
+                    # Only accepted reads are cached
+                    (text, events), confidence = cached, 1.0
+                else:
+                    with self.perf.span("ocr"):
+                        text, confidence = read_event_name_with_confidence(binary)
+                    text, events = text.strip(), None
+            finally:
+                game_date, option_labels = "", ()
+                if option_count is not None:
+                    with self.perf.span("screen_text"):
+                        game_date, option_labels = self.collect_screen_text(option_count)
+            self.last_ocr = (key, text, confidence, events, game_date, option_labels)
+        (frame.ocr_key, frame.event_name, frame.ocr_confidence, frame.cached_events,
+         frame.game_date, frame.option_labels) = self.last_ocr
+        self.forward(self.lookup_queue, frame)
+
+    def option_label_crops(self, frame):
+        """Label crops of the option buttons, top to bottom, located from the matched event icon."""
+        if self.option_label_box is None or frame.event_icon_location is None:
+            return []
+        screen = frame.capture.view("left_screen", "bgra")
+        gray = frame.capture.view("left_screen", "gray")
+        icons = [frame.event_icon_location]
+        # Every button has the icon; the detector may have matched any of them, so look both ways
+        for step in (-self.option_pitch, self.option_pitch):
+            location = frame.event_icon_location
+            while len(icons) < MAX_OPTION_BUTTONS:
+                location, _ = self.event_detector.detect_near(gray, (location[0], location[1] + step),
+                                                              self.option_icon_margin)
+                if location is None:
+                    break
+                icons.append(location)
+        dx, dy, width, height = self.option_label_box
+        crops = []
+        for x, y in sorted(icons, key=lambda icon: icon[1]):
+            left, top = max(0, x + dx), max(0, y + dy)
+            crop = screen[top:y + dy + height, left:x + dx + width]
+            if crop.size:
+                crops.append(crop)
+        return crops
+
+    def submit_screen_text(self, frame):
+        """Hand the date and option label crops to the OCR pool; returns the number of option labels, or None."""
+        crops = {}
+        if self.date_region is not None:
+            crops["date"] = frame.capture.view("date", "bgra")
+        option_crops = self.option_label_crops(frame)
+        for number, crop in enumerate(option_crops, 1):
+            crops[f"option_{number}"] = crop
+        try:
+            self.ocr_pool.submit(crops, SCREEN_TEXT_PREPROCESS)
+        except Exception as e:
+            # A dead worker breaks the whole pool; the title doesn't need it
+            print(f"[WARNING] OCR pool failed, reading event titles only: {e}")
+            self.ocr_pool.close()
+            self.ocr_pool = None
+            return None
+        return len(option_crops)
+
+    def collect_screen_text(self, option_count):
+        """Wait for the pool; returns (in-game date, option labels top to bottom)."""
+        results = self.ocr_pool.results()
+        game_date = results.get("date", ("", None))[0]
+        option_labels = tuple(results[f"option_{number}"][0] for number in range(1, option_count + 1))
+        return game_date, option_labels
+
+    def find_events(self, frame):
+        """Resolve the frame's read through the OCR cache, falling back to a search."""
+        if frame.cached_events is not None:
+            found_events = self.event_index.resolve(frame.cached_events)
+            # An empty resolution of a non-empty entry means the databases changed since
+            if found_events or not frame.cached_events:
+                return found_events
+        with self.perf.span("search"):
+            return self.event_index.find(frame.event_name)
+
+    def match_confidence(self, frame, found_events):
+        """Confidence that the read is the best matching in-vocabulary name."""
+        if not found_events:
+            return 0.0
+        score = next(iter(found_events.values()))["score"]
+        if frame.ocr_confidence is not None:
+            score *= frame.ocr_confidence
+        return score
+
+    def accept(self, frame, found_events):
+        """Remember an accepted read so the same banner skips OCR next time."""
+        if frame.cached_events is None and frame.ocr_key is not None:
+            events = [(event_name, event_data["score"]) for event_name, event_data in found_events.items()]
+            self.ocr_cache.put(frame.ocr_key, frame.event_name, events)
+            frame.cached_events = events
+
+    def reread(self):
+        """Make the OCR stage read the title again instead of reusing its last read of an unchanged crop.
+
+        Only the OCR thread touches its change detector and last read, so this
+        just leaves it a request to drop them before its next frame.
+        """
+        self.reread_requested.set()
+
+    def record(self, kind, frame, found_events, lookup_started):
+        """Append a decision to the session log with the frame's per-stage timings."""
+        timings = {
+            "detect": frame.stage_ms.get("detect"),
+            "ocr": frame.stage_ms.get("ocr"),
+            "lookup": (time.monotonic() - lookup_started) * 1000,
+            "latency": (time.time() - frame.timestamp) * 1000,
+        }
+        event_name = source = score = None
+        if found_events:
+            event_name, event_data = next(iter(found_events.items()))
+            source, score = event_data["source"], event_data["score"]
+        self.session_log.record(kind, frame.event_name, event_name, source, score, timings, frame.timestamp,
+                                frame.game_date)
+
+    def lookup_stage(self, frame):
+        lookup_started = time.monotonic()
+        event_name = frame.event_name
+        with self.state_lock:
+            if frame.generation != self.generation:
+                # The event disappeared while it was being read
+                return
+            last_event_name = self.last_event_name
+            already_tracked = event_name in self.tracked_support_events
+
+        if frame.support_card_event:
+            if event_name and not already_tracked and event_name != "A Hint for Growth":
+                found_events = self.find_events(frame)
+                if found_events and self.match_confidence(frame, found_events) >= MIN_MATCH_CONFIDENCE:
+                    self.accept(frame, found_events)
+                    found_event_name = next(iter(found_events))
+                    with self.state_lock:
+                        newly_tracked = found_event_name not in self.tracked_support_events
+                        self.tracked_support_events.add(found_event_name)
+                    if newly_tracked:
+                        # Logged before the UI hears of it, so the tracker finds the row
+                        self.record(KIND_SUPPORT, frame, found_events, lookup_started)
+                        self.emit(UI_SUPPORT_EVENT, found_event_name)
+
+        if frame.event_icon and event_name and event_name != last_event_name:
+            found_events = self.find_events(frame)
+            shown = False
+            confident = self.match_confidence(frame, found_events) >= MIN_MATCH_CONFIDENCE
+            with self.state_lock:
+                if not confident and self.rejected_reads + 1 < MAX_REJECTED_READS:
+                    # Probably a bad read (e.g. the banner is still animating in); try the next frame
+                    self.rejected_reads += 1
+                    self.reread()
+                    self.emit(UI_STATUS, "❓ Unclear event title, reading again...", '#FFC107')
+                else:
+                    # A read shown only because it was rejected too often is never cached
+                    if confident:
+                        self.accept(frame, found_events)
+                    self.emit(UI_EVENT, event_name, found_events, frame.option_labels)
+                    self.last_event_name = event_name
+                    self.event_displayed = True
+                    shown = True
+            if shown:
+                self.record(KIND_EVENT, frame, found_events, lookup_started)
+
+        with self.state_lock:
+            self.event_detection_start = None
+            self.ocr_pending = False
@@ -0,0 +1,123 @@
+"""Preprocessing of title crops before OCR.
+
+Runs on NumPy/OpenCV arrays end to end and writes into buffers that are
+allocated once per crop size, so a steady stream of same-sized crops does
+no per-frame allocation. The stages are selectable:
+
+* threshold: ``fixed`` (the historical cut at 200, or ``fixed_threshold``), ``otsu`` (picks the cut
+  per crop, so dimmer banners still separate) or ``adaptive`` (local mean,
+  for uneven backgrounds)
+* upscale: integer factor applied to the grayscale crop before thresholding,
+  which helps Tesseract on small text
+* crop: trim the binary image to the bounding box of the text plus a margin
+"""
+
+import cv2
+import numpy as np
+
+from core.perf import PerfStats
+
+THRESHOLD_METHODS = ("fixed", "otsu", "adaptive")
+FIXED_THRESHOLD = 200
+# Neighbourhood (in source pixels) and offset for the adaptive threshold
+ADAPTIVE_BLOCK_SIZE = 31
+ADAPTIVE_OFFSET = 10
+# Blank margin kept around the text when cropping, in source pixels
+CROP_MARGIN = 4
+
+_GRAY_CONVERSIONS = {3: cv2.COLOR_BGR2GRAY, 4: cv2.COLOR_BGRA2GRAY}
+
+
+class Preprocessor:
+    """Turns BGR/BGRA/grayscale crops into binary images.
+
+    Every method keeps the polarity of the fixed threshold: pixels brighter
+    than the cut (or, for ``adaptive``, than their neighbourhood) become 255.
+
+    The returned image is a view into an internal buffer and stays valid
+    until the next call with a crop of the same size; copy it to keep it.
+    A Preprocessor is not thread-safe, give each thread its own.
+    """
+
+    def __init__(self, threshold="otsu", upscale=1, crop=False, fixed_threshold=FIXED_THRESHOLD, perf=None):
+        if threshold not in THRESHOLD_METHODS:
+            raise ValueError(f"Unknown threshold method {threshold!r}, expected one of {THRESHOLD_METHODS}")
+        if int(upscale) != upscale or upscale < 1:
+            raise ValueError(f"Upscale factor must be a positive integer, got {upscale!r}")
+        self.threshold = threshold
+        self.upscale = int(upscale)
+        self.crop = crop
+        self.fixed_threshold = fixed_threshold
+        self.perf = perf if perf is not None else PerfStats()
+        self.buffers = {}
+
+    def _buffers_for(self, shape):
+        buffers = self.buffers.get(shape)
+        if buffers is None:
+            height, width = shape[:2]
+            scaled = (height * self.upscale, width * self.upscale)
+            buffers = self.buffers[shape] = {
+                "gray": np.empty((height, width), dtype=np.uint8),
+                "scaled": np.empty(scaled, dtype=np.uint8) if self.upscale > 1 else None,
+                "binary": np.empty(scaled, dtype=np.uint8),
+            }
+        return buffers
+
+    def __call__(self, image):
+        """Binarize one crop; see the class docstring for the lifetime of the result."""
+        image = np.asarray(image)
+        buffers = self._buffers_for(image.shape)
+
+        with self.perf.span("gray"):
+            if image.ndim == 2:
+                gray = image
+            else:
+                gray = cv2.cvtColor(image, _GRAY_CONVERSIONS[image.shape[2]], dst=buffers["gray"])
+
+        if self.upscale > 1:
+            with self.perf.span("upscale"):
+                scaled = buffers["scaled"]
+                gray = cv2.resize(gray, (scaled.shape[1], scaled.shape[0]), dst=scaled,
+                                  interpolation=cv2.INTER_CUBIC)
+
+        with self.perf.span("threshold"):
+            binary = buffers["binary"]
+            if self.threshold == "adaptive":
+                binary = cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_MEAN_C, cv2.THRESH_BINARY,
+                                               (ADAPTIVE_BLOCK_SIZE * self.upscale) | 1, -ADAPTIVE_OFFSET,
+                                               dst=binary)
+            elif self.threshold == "otsu":
+                _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU, dst=binary)
+            else:
+                _, binary = cv2.threshold(gray, self.fixed_threshold, 255, cv2.THRESH_BINARY, dst=binary)
+
+        if self.crop:
+            with self.perf.span("crop"):
+                binary = crop_to_text(binary, CROP_MARGIN * self.upscale)
+        return binary
+
+
+def text_mask(binary):
+    """Boolean mask of the text pixels: whichever binary value is in the minority."""
+    ink = binary < 128
+    if np.count_nonzero(ink) * 2 > ink.size:
+        ink = ~ink
+    return ink
+
+
+def crop_to_text(binary, margin=CROP_MARGIN):
+    """Return a view of ``binary`` trimmed to its text plus ``margin``.
+
+    Works for dark text on white as well as white text on black (see
+    ``text_mask``). A blank crop is returned unchanged.
+    """
+    ink = text_mask(binary)
+    rows = np.flatnonzero(ink.any(axis=1))
+    if rows.size == 0:
+        return binary
+    columns = np.flatnonzero(ink.any(axis=0))
+    top = max(0, rows[0] - margin)
+    bottom = min(binary.shape[0], rows[-1] + 1 + margin)
+    left = max(0, columns[0] - margin)
+    right = min(binary.shape[1], columns[-1] + 1 + margin)
+    return binary[top:bottom, left:right]
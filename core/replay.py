@@ -0,0 +1,211 @@
+"""Offline replay of recorded frames through the detect → OCR → match path.
+
+Runs the same template detection, OCR and database lookup the overlay uses,
+but on recorded screenshots or a video at any 16:9 resolution, without Tk
+or mss, and reports per-stage latency, throughput, accuracy and peak memory.
+"""
+
+import os
+import time
+import tracemalloc
+
+import cv2
+
+from core.event_index import normalize_event_name
+from core.ocr import read_counts, read_event_name_with_confidence
+from core.perf import PerfStats, percentile
+from core.preprocess import Preprocessor
+from core.layout import Layout
+from core.pipeline import (EVENT_REGION, LEFT_SCREEN_REGION, SUPPORT_CARD_EVENT_REGION,
+                           EVENT_TEMPLATE_PATH, SUPPORT_CARD_EVENT_TEMPLATE_PATH)
+from utils.match_template import TemplateDetector
+from utils.screenshot import CapturedFrame
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+STAGES = ("detect", "preprocess", "ocr", "match")
+
+
+def iter_frames(source):
+    """Yield (frame id, BGR image) from a directory of images or a video file."""
+    if os.path.isdir(source):
+        for file_name in sorted(os.listdir(source)):
+            if not file_name.lower().endswith(IMAGE_EXTENSIONS):
+                continue
+            image = cv2.imread(os.path.join(source, file_name))
+            if image is not None:
+                yield file_name, image
+        return
+
+    capture = cv2.VideoCapture(source)
+    try:
+        frame_number = 0
+        while True:
+            ok, image = capture.read()
+            if not ok:
+                break
+            yield str(frame_number), image
+            frame_number += 1
+    finally:
+        capture.release()
+
+
+class ReplayBenchmark:
+    """Feeds frames through detection, OCR and matching and records timings."""
+
+    def __init__(self, event_index, event_template_path=EVENT_TEMPLATE_PATH,
+                 support_card_event_template_path=SUPPORT_CARD_EVENT_TEMPLATE_PATH, preprocess_options=None):
+        self.event_index = event_index
+        self.event_template_path = event_template_path
+        self.support_card_event_template_path = support_card_event_template_path
+        # Unbounded window so every preprocessing stage is reported over the whole run
+        self.preprocess_stats = PerfStats(window=None)
+        self.preprocess_stats.enabled = True
+        self.preprocessor = Preprocessor(perf=self.preprocess_stats, **(preprocess_options or {}))
+        # Scaled regions and detectors by frame resolution
+        self.layouts = {}
+        self.timings = {stage: [] for stage in STAGES}
+
+    def layout_for(self, image):
+        """Regions and detectors scaled to the frame's resolution, built once per resolution."""
+        height, width = image.shape[:2]
+        setup = self.layouts.get((width, height))
+        if setup is None:
+            layout = Layout(width, height)
+            options = layout.detector_options()
+            regions = layout.regions({
+                "left_screen": LEFT_SCREEN_REGION,
+                "support_card_event": SUPPORT_CARD_EVENT_REGION,
+                "event": EVENT_REGION,
+            })
+            event_template = layout.template(self.event_template_path)
+            if event_template is None:
+                raise FileNotFoundError(f"Event template not found: {self.event_template_path}")
+            event_detector = TemplateDetector(event_template, threshold=0.8, **options)
+            support_card_event_detector = None
+            support_card_event_template = layout.template(self.support_card_event_template_path)
+            if support_card_event_template is not None:
+                support_card_event_detector = TemplateDetector(support_card_event_template, threshold=0.8, **options)
+            setup = self.layouts[(width, height)] = (regions, event_detector, support_card_event_detector)
+        return setup
+
+    def process(self, image):
+        """Run one BGR frame through the pipeline; returns the matched event name or None."""
+        regions, event_detector, support_card_event_detector = self.layout_for(image)
+        capture = CapturedFrame(cv2.cvtColor(image, cv2.COLOR_BGR2BGRA), (0, 0), regions)
+
+        started = time.perf_counter()
+        location, _ = event_detector.detect(capture.view("left_screen", "gray"))
+        detected = location is not None
+        if support_card_event_detector is not None:
+            location, _ = support_card_event_detector.detect(capture.view("support_card_event", "gray"))
+            detected = detected or location is not None
+        self.timings["detect"].append(time.perf_counter() - started)
+        if not detected:
+            return None
+
+        started = time.perf_counter()
+        binary = self.preprocessor(capture.view("event", "bgra"))
+        self.timings["preprocess"].append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        event_name, _ = read_event_name_with_confidence(binary)
+        self.timings["ocr"].append(time.perf_counter() - started)
+        if not event_name:
+            return None
+
+        started = time.perf_counter()
+        found_events = self.event_index.find(event_name)
+        self.timings["match"].append(time.perf_counter() - started)
+        return next(iter(found_events), None)
+
+    def run(self, frames, labels=None):
+        """
+        Process every frame and build a report.
+
+        Args:
+            frames: Iterable of (frame id, BGR image).
+            labels: Optional {frame id: expected event name or None}.
+        """
+        if resource is None:
+            tracemalloc.start()
+        counts_before = dict(read_counts)
+        results = {}
+        started = time.perf_counter()
+        for frame_id, image in frames:
+            results[frame_id] = self.process(image)
+        elapsed = time.perf_counter() - started
+
+        report = {
+            "frames": len(results),
+            "seconds": elapsed,
+            "fps": len(results) / elapsed if elapsed else 0.0,
+            "stages": {},
+            "peak_memory_mb": self.peak_memory_mb(),
+        }
+        for stage, values in self.timings.items():
+            report["stages"][stage] = {
+                "count": len(values),
+                "p50_ms": percentile(values, 50) * 1000,
+                "p90_ms": percentile(values, 90) * 1000,
+                "p99_ms": percentile(values, 99) * 1000,
+                "max_ms": max(values, default=0.0) * 1000,
+            }
+
+        report["ocr_reads"] = {engine: read_counts[engine] - counts_before[engine] for engine in read_counts}
+        report["preprocess_stages"] = self.preprocess_stats.summary()
+        report["preprocessing"] = {"threshold": self.preprocessor.threshold,
+                                   "upscale": self.preprocessor.upscale,
+                                   "crop": self.preprocessor.crop}
+
+        if labels:
+            # Frames labelled without an event say nothing about name accuracy (they'd pass with no OCR at all)
+            labelled = [frame_id for frame_id in results if labels.get(frame_id)]
+            no_event = [frame_id for frame_id in results if frame_id in labels and not labels[frame_id]]
+            correct = sum(1 for frame_id in labelled if results[frame_id] is not None
+                          and normalize_event_name(results[frame_id]) == normalize_event_name(labels[frame_id]))
+            report["labelled"] = len(labelled)
+            report["accuracy"] = correct / len(labelled) if labelled else None
+            report["no_event_frames"] = len(no_event)
+            report["true_negatives"] = sum(1 for frame_id in no_event if results[frame_id] is None)
+
+        if resource is None:
+            tracemalloc.stop()
+        return report
+
+    @staticmethod
+    def peak_memory_mb():
+        if resource is not None:
+            # ru_maxrss is in kilobytes on Linux
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+        return tracemalloc.get_traced_memory()[1] / (1024.0 * 1024.0)
+
+
+def format_report(report):
+    """Render a replay report as text."""
+    lines = [
+        f"Frames: {report['frames']} in {report['seconds']:.2f}s ({report['fps']:.1f} fps)",
+        f"Peak memory: {report['peak_memory_mb']:.1f} MB",
+    ]
+    if report.get("ocr_reads"):
+        lines.append("OCR reads: " + ", ".join(f"{count} {engine}" for engine, count in report["ocr_reads"].items()))
+    if report.get("accuracy") is not None:
+        lines.append(f"Accuracy: {report['accuracy'] * 100:.1f}% of {report['labelled']} frames labelled with an event")
+    if report.get("no_event_frames"):
+        lines.append(f"No-event frames: {report['true_negatives']} of {report['no_event_frames']} matched nothing")
+    lines.append(f"{'stage':<10}{'count':>7}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for stage, stats in report["stages"].items():
+        lines.append(f"{stage:<10}{stats['count']:>7}{stats['p50_ms']:>10.2f}{stats['p90_ms']:>10.2f}"
+                     f"{stats['p99_ms']:>10.2f}{stats['max_ms']:>10.2f}")
+    if report.get("preprocess_stages"):
+        options = report["preprocessing"]
+        lines.append(f"Preprocessing (threshold={options['threshold']}, upscale={options['upscale']}, "
+                     f"crop={options['crop']}):")
+        for stage, stats in report["preprocess_stages"].items():
+            lines.append(f"  {stage:<8}{stats['count']:>7}{stats['p50_ms']:>10.2f}{stats['p90_ms']:>10.2f}"
+                         f"{stats['p99_ms']:>10.2f}{stats['max_ms']:>10.2f}")
+    return "\n".join(lines)
@@ -0,0 +1,78 @@
+"""Adaptive polling interval for the capture loop.
+
+Polls slowly while nothing event-like is on screen, switches to a fast
+interval as soon as a template scores close to its threshold, and backs off
+again once the event is displayed. The interval never drops below what the
+pipeline's measured work per tick allows within the CPU budget.
+"""
+
+import threading
+
+IDLE = "idle"
+ALERT = "alert"
+DISPLAYED = "displayed"
+
+
+class AdaptiveScheduler:
+    """Chooses the delay before the next capture from what the last frames showed.
+
+    ``cpu_budget`` is the fraction of one core the pipeline may use on
+    average; ``near_margin`` is how far below a template's threshold a score
+    still counts as "something is appearing".
+    """
+
+    def __init__(self, idle_interval=0.6, alert_interval=0.05, displayed_interval=0.3,
+                 near_margin=0.15, backoff=1.5, cpu_budget=0.25, smoothing=0.2):
+        self.idle_interval = idle_interval
+        self.alert_interval = alert_interval
+        self.displayed_interval = displayed_interval
+        self.near_margin = near_margin
+        self.backoff = backoff
+        self.cpu_budget = cpu_budget
+        self.smoothing = smoothing
+
+        self.lock = threading.Lock()
+        self.state = IDLE
+        self.interval = idle_interval
+        self.pending_work = 0.0
+        self.work_per_tick = 0.0
+        self.ticks = {IDLE: 0, ALERT: 0, DISPLAYED: 0}
+
+    def add_work(self, seconds):
+        """Account busy time spent by any pipeline stage."""
+        with self.lock:
+            self.pending_work += seconds
+
+    def observe(self, scores, detected, displayed):
+        """
+        Update the state from one detected frame.
+
+        Args:
+            scores: (score, threshold) pairs of each template detector.
+            detected: Whether any template matched.
+            displayed: Whether the current event is already on the overlay.
+        """
+        near = any(score >= threshold - self.near_margin for score, threshold in scores)
+        with self.lock:
+            if displayed:
+                self.state = DISPLAYED
+                self.interval = self.displayed_interval
+            elif detected or near:
+                # Jump straight to fast polling so the title is read as soon as it settles
+                self.state = ALERT
+                self.interval = self.alert_interval
+            else:
+                self.state = IDLE
+                self.interval = min(self.idle_interval, self.interval * self.backoff)
+
+    def next_interval(self):
+        """Delay before the next capture, honouring the CPU budget."""
+        with self.lock:
+            self.work_per_tick += self.smoothing * (self.pending_work - self.work_per_tick)
+            self.pending_work = 0.0
+            self.ticks[self.state] += 1
+            return max(self.interval, self.work_per_tick / self.cpu_budget)
+
+    def summary(self):
+        with self.lock:
+            return dict(self.ticks)
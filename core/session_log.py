@@ -0,0 +1,197 @@
+"""Persistent log of every event the overlay detected.
+
+Each run gets a row in ``runs``; every decision the pipeline makes (an
+event shown on the overlay, a support event added to the tracker) is
+appended to ``detections`` with the raw OCR read, the matched database
+entry, when it happened (also as the in-game date, when it could be read)
+and how long each stage took. Rows are never updated, so the tracker can
+pick up new support events incrementally by asking for the rows after the
+last id it has shown.
+
+The log is a single SQLite file in WAL mode, written from the lookup
+thread and read from the Tk thread through one shared connection.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+
+SESSION_LOG_PATH = "assets/events/session_log.sqlite"
+SCHEMA_VERSION = 2
+
+# Detection kinds
+KIND_EVENT = "event"
+KIND_SUPPORT = "support"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    started REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS detections (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    timestamp REAL NOT NULL,
+    kind TEXT NOT NULL,
+    ocr_text TEXT NOT NULL,
+    event_name TEXT,
+    source TEXT,
+    score REAL,
+    detect_ms REAL,
+    ocr_ms REAL,
+    lookup_ms REAL,
+    latency_ms REAL,
+    game_date TEXT
+);
+CREATE INDEX IF NOT EXISTS detections_by_run ON detections(run_id, kind, id);
+CREATE INDEX IF NOT EXISTS detections_unmatched ON detections(ocr_text) WHERE event_name IS NULL;
+"""
+# Upgrades of older logs, by the schema version they start from
+MIGRATIONS = {
+    1: "ALTER TABLE detections ADD COLUMN game_date TEXT",
+}
+
+
+class SessionLog:
+    """
+    Append-only SQLite log of detections across runs.
+
+    Args:
+        path: Database file; None keeps the log in memory for this run only.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.connection = None
+        self.run_id = None
+        self.lock = threading.Lock()
+
+    def open(self, new_run=True):
+        """Open (or create) the log and, unless only reading it, start a new run."""
+        try:
+            self.connection = self._connect(self.path)
+        except sqlite3.Error as e:
+            print(f"[WARNING] Session log unavailable, keeping this run in memory: {e}")
+            self.connection = self._connect(None)
+        if not new_run:
+            return
+        with self.lock, self.connection:
+            cursor = self.connection.execute("INSERT INTO runs (started) VALUES (?)", (time.time(),))
+            self.run_id = cursor.lastrowid
+
+    @staticmethod
+    def _connect(path):
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        connection = sqlite3.connect(path or ":memory:", check_same_thread=False)
+        version = connection.execute("PRAGMA user_version").fetchone()[0]
+        if version not in (0, SCHEMA_VERSION) and version not in MIGRATIONS:
+            connection.close()
+            raise sqlite3.DatabaseError(f"unknown schema version {version} in {path}")
+        if path:
+            connection.execute("PRAGMA journal_mode=WAL")
+            # A lost last row on power failure is fine for a log; an fsync per detection isn't
+            connection.execute("PRAGMA synchronous=NORMAL")
+        connection.executescript(SCHEMA)
+        if version:
+            for step in range(version, SCHEMA_VERSION):
+                connection.execute(MIGRATIONS[step])
+        connection.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+        return connection
+
+    def close(self):
+        if self.connection is not None:
+            with self.lock:
+                self.connection.close()
+                self.connection = None
+
+    def record(self, kind, ocr_text, event_name=None, source=None, score=None, timings=None, timestamp=None,
+               game_date=None):
+        """
+        Append one detection to the current run.
+
+        Args:
+            kind: KIND_EVENT or KIND_SUPPORT.
+            ocr_text: The raw OCR read.
+            event_name: The matched database event, or None if nothing matched.
+            source: The matched event's source database.
+            score: The match score (0-1).
+            timings: Optional {"detect", "ocr", "lookup", "latency"} durations in milliseconds.
+            timestamp: When the frame was captured (default now).
+            game_date: The in-game date shown on screen, e.g. "Junior Year Pre-Debut".
+
+        Return:
+            The new row id, or None if the log isn't open.
+        """
+        if self.connection is None:
+            return None
+        timings = timings or {}
+        row = (self.run_id, timestamp if timestamp is not None else time.time(), kind, ocr_text, event_name,
+               source, score, timings.get("detect"), timings.get("ocr"), timings.get("lookup"),
+               timings.get("latency"), game_date or None)
+        try:
+            with self.lock, self.connection:
+                cursor = self.connection.execute(
+                    "INSERT INTO detections (run_id, timestamp, kind, ocr_text, event_name, source, score,"
+                    " detect_ms, ocr_ms, lookup_ms, latency_ms, game_date) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    row)
+                return cursor.lastrowid
+        except sqlite3.Error as e:
+            print(f"[WARNING] Could not write session log: {e}")
+            return None
+
+    def _query(self, sql, parameters=()):
+        if self.connection is None:
+            return []
+        with self.lock:
+            return self.connection.execute(sql, parameters).fetchall()
+
+    def last_id(self):
+        """Id of the newest detection in any run, 0 if there are none."""
+        rows = self._query("SELECT MAX(id) FROM detections")
+        return (rows[0][0] or 0) if rows else 0
+
+    def latest_run(self):
+        """Id of the newest run, or None for an empty log."""
+        rows = self._query("SELECT MAX(id) FROM runs")
+        return rows[0][0] if rows else None
+
+    def support_events(self, after_id=0, run_id=None):
+        """
+        Support events seen in a run (default the current one), oldest first.
+
+        Return:
+            [(row id, event name, in-game date or None)] for the rows after ``after_id``.
+        """
+        return self._query(
+            "SELECT id, event_name, game_date FROM detections WHERE run_id = ? AND kind = ? AND id > ? ORDER BY id",
+            (run_id or self.run_id, KIND_SUPPORT, after_id))
+
+    def unmatched_ocr(self, limit=20, run_id=None):
+        """
+        OCR reads that matched no event, most frequent first.
+
+        Return:
+            [(ocr text, count)], across every run unless ``run_id`` is given.
+        """
+        if run_id is None:
+            return self._query(
+                "SELECT ocr_text, COUNT(*) AS seen FROM detections WHERE event_name IS NULL"
+                " GROUP BY ocr_text ORDER BY seen DESC, ocr_text LIMIT ?", (limit,))
+        return self._query(
+            "SELECT ocr_text, COUNT(*) AS seen FROM detections WHERE event_name IS NULL AND run_id = ?"
+            " GROUP BY ocr_text ORDER BY seen DESC, ocr_text LIMIT ?", (run_id, limit))
+
+    def run_summary(self, run_id=None):
+        """
+        Return (detections, unmatched, mean capture-to-decision latency in ms) for a run.
+        """
+        rows = self._query(
+            "SELECT COUNT(*), COUNT(*) - COUNT(event_name), AVG(latency_ms) FROM detections WHERE run_id = ?",
+            (run_id or self.run_id,))
+        if not rows:
+            return 0, 0, None
+        return rows[0]
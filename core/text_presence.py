@@ -0,0 +1,128 @@
+"""Cheap check that the event title is fully rendered before OCR runs.
+
+The event icon can match while the title banner is still sliding or fading
+in, and OCR of such a frame yields junk. Each binarized title crop is
+reduced to its ink ratio, typical stroke width and a coarse column profile
+of where the ink is. The crop counts as readable once it holds something
+text-like and that signature has stayed put across consecutive ticks. A
+title that never gets there (an animated shine across the banner, an
+unusual background) is read anyway after a bounded number of checks.
+"""
+
+import numpy as np
+
+from core.preprocess import text_mask
+
+# Reasons a crop isn't read yet
+NO_TEXT = "no text"
+UNSETTLED = "unsettled"
+
+
+class TextSignature:
+    __slots__ = ("ink_ratio", "stroke_width", "profile")
+
+    def __init__(self, ink_ratio, stroke_width, profile):
+        self.ink_ratio = ink_ratio
+        self.stroke_width = stroke_width
+        self.profile = profile
+
+
+def text_signature(binary, bins=48):
+    """Summarize a binarized crop as a TextSignature."""
+    ink = text_mask(binary)
+    height, width = ink.shape
+    ink_count = int(np.count_nonzero(ink))
+    # Every horizontal run of ink starts and ends with a transition, so ink / (transitions / 2) is the mean run length
+    transitions = int(np.count_nonzero(ink[:, 1:] != ink[:, :-1])) + int(np.count_nonzero(ink[:, 0])) \
+        + int(np.count_nonzero(ink[:, -1]))
+    stroke_width = 2.0 * ink_count / transitions if transitions else 0.0
+
+    columns = ink.sum(axis=0, dtype=np.int32)
+    edges = np.linspace(0, width, min(bins, width) + 1).astype(np.intp)[:-1]
+    profile = np.add.reduceat(columns, edges).astype(np.float32)
+    if ink_count:
+        profile /= ink_count
+    return TextSignature(ink_count / float(height * width), stroke_width / height, profile)
+
+
+class TextPresenceGate:
+    """
+    Decides whether a title crop is worth handing to OCR.
+
+    Args:
+        min_ink: Smallest text pixel ratio that can be a title.
+        max_ink: Largest text pixel ratio that can be a title.
+        max_stroke: Largest mean stroke width, as a fraction of the crop height;
+            solid shapes (a banner edge sliding through) are wider than any glyph.
+        ink_tolerance: Largest change in ink ratio between ticks still counted as settled.
+        profile_tolerance: Largest L1 distance between consecutive column profiles
+            (each summing to 1) still counted as settled.
+        settled_ticks: Consecutive matching signatures needed before reading.
+        max_skips: Consecutive skipped crops after which the next one is read
+            anyway; None waits for settled text however long it takes.
+    """
+
+    def __init__(self, min_ink=0.02, max_ink=0.45, max_stroke=0.35, ink_tolerance=0.005,
+                 profile_tolerance=0.08, settled_ticks=2, max_skips=None):
+        self.min_ink = min_ink
+        self.max_ink = max_ink
+        self.max_stroke = max_stroke
+        self.ink_tolerance = ink_tolerance
+        self.profile_tolerance = profile_tolerance
+        self.settled_ticks = settled_ticks
+        self.max_skips = max_skips
+        self.previous = None
+        self.matching = 0
+        self.skipped = 0
+        self.skips = {NO_TEXT: 0, UNSETTLED: 0}
+        self.passes = 0
+        self.forced = 0
+
+    def reset(self):
+        """Forget the previous crop, e.g. when the event disappears."""
+        self.previous = None
+        self.matching = 0
+        self.skipped = 0
+
+    def check(self, binary):
+        """
+        Compare a binarized title crop with the previous one.
+
+        Return:
+            None when the crop should be read, otherwise NO_TEXT or UNSETTLED.
+        """
+        reason = self._verdict(binary)
+        if reason is None:
+            self.skipped = 0
+            self.passes += 1
+            return None
+        self.skipped += 1
+        if self.max_skips is not None and self.skipped > self.max_skips:
+            # Waited long enough; a read of whatever is there beats never reading the event
+            self.skipped = 0
+            self.forced += 1
+            return None
+        self.skips[reason] += 1
+        return reason
+
+    def _verdict(self, binary):
+        signature = text_signature(binary)
+        previous, self.previous = self.previous, signature
+
+        if not (self.min_ink <= signature.ink_ratio <= self.max_ink) or signature.stroke_width > self.max_stroke:
+            self.matching = 0
+            return NO_TEXT
+
+        if (previous is not None and previous.profile.shape == signature.profile.shape
+                and abs(signature.ink_ratio - previous.ink_ratio) <= self.ink_tolerance
+                and float(np.abs(signature.profile - previous.profile).sum()) <= self.profile_tolerance):
+            self.matching += 1
+        else:
+            self.matching = 1
+        if self.matching < self.settled_ticks:
+            return UNSETTLED
+        return None
+
+    def summary(self):
+        """Return (read, read after too many skips, skipped without text, skipped while unsettled) counts."""
+        return self.passes, self.forced, self.skips[NO_TEXT], self.skips[UNSETTLED]
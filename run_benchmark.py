@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Replay Benchmark
+Feeds recorded frames (a directory of screenshots or a video)
+through event detection, OCR and database matching without the overlay,
+and reports per-stage latency, frames per second, accuracy and peak memory.
+
+Labels are a JSON object mapping frame file names (or frame numbers for a
+video) to the expected event name, or null for frames without an event.
+"""
+
+import argparse
+import json
+import sys
+import os
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core.event_database import EventDatabase
+from core.ocr import configure_glyph_atlas
+from core.preprocess import THRESHOLD_METHODS
+from core.replay import ReplayBenchmark, format_report, iter_frames
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the detect → OCR → match path on recorded frames.")
+    parser.add_argument("source", help="directory of frames or a video file")
+    parser.add_argument("--labels", help="JSON file mapping frame ids to expected event names")
+    parser.add_argument("--json", dest="json_path", help="also write the report to this JSON file")
+    parser.add_argument("--threshold", choices=THRESHOLD_METHODS, default="otsu", help="event title binarization (default otsu)")
+    parser.add_argument("--upscale", type=int, default=1, help="integer factor to enlarge the event title before OCR")
+    parser.add_argument("--crop-text", action="store_true", help="crop the event title to its text before OCR")
+    parser.add_argument("--glyph-atlas", help="read titles with this glyph atlas first, falling back to Tesseract")
+    args = parser.parse_args()
+
+    labels = None
+    if args.labels:
+        with open(args.labels, "r", encoding="utf-8") as f:
+            labels = json.load(f)
+
+    database = EventDatabase.load()
+    if args.glyph_atlas and args.crop_text:
+        print("❌ --glyph-atlas reads the whole title region and can't be combined with --crop-text")
+        return
+    if args.glyph_atlas and not configure_glyph_atlas(args.glyph_atlas):
+        print(f"❌ Could not load the glyph atlas {args.glyph_atlas}")
+        return
+    preprocess_options = {"threshold": args.threshold, "upscale": args.upscale, "crop": args.crop_text}
+    benchmark = ReplayBenchmark(database.event_index, preprocess_options=preprocess_options)
+    report = benchmark.run(iter_frames(args.source), labels)
+    print(format_report(report))
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,7 @@ This script runs the real-time event overlay that displays event information
 in a semi-transparent box on screen.
 """
 
+import argparse
 import sys
 import os
 
@@ -12,17 +13,38 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from core.event_overlay import main
+from core.preprocess import THRESHOLD_METHODS
+
+
+def parse_resolution(value):
+    try:
+        width, height = (int(part) for part in value.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected WIDTHxHEIGHT, got {value!r}")
+    return width, height
+
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Umamusume event overlay")
+    parser.add_argument("--perf-log", help="append hot path timings to this JSON-lines file every few seconds")
+    parser.add_argument("--cpu-budget", type=float, help="fraction of one CPU core event detection may use (default 0.25)")
+    parser.add_argument("--threshold", choices=THRESHOLD_METHODS, default="otsu", help="event title binarization (default otsu)")
+    parser.add_argument("--upscale", type=int, default=1, help="integer factor to enlarge the event title before OCR")
+    parser.add_argument("--crop-text", action="store_true", help="crop the event title to its text before OCR")
+    parser.add_argument("--resolution", type=parse_resolution, help="game screen size as WIDTHxHEIGHT (default: detect the primary monitor)")
+    args = parser.parse_args()
+    preprocess_options = {"threshold": args.threshold, "upscale": args.upscale, "crop": args.crop_text}
+
     print("🎮 Umamusume Event Overlay")
     print("=" * 50)
     print("This will create a semi-transparent overlay window that shows")
     print("event information in real-time as you play.")
     print()
-    print("Overlay will appear at position (964, 810) with size 796x269")
+    print("Overlay will appear at position (958, 810) with size 798x269 (scaled from 1920x1080)")
     print("Close the overlay window or press Ctrl+C to stop.")
     print()
     
     input("Press Enter to start the event overlay...")
     
-    main() 
\ No newline at end of file
+    main(perf_log_path=args.perf_log, cpu_budget=args.cpu_budget, preprocess_options=preprocess_options,
+         resolution=args.resolution)
\ No newline at end of file
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Event Lookup
+Matches OCR strings against the event databases without starting the
+overlay. Reads one query per line from stdin and writes one JSON line per
+query with the ranked matches, their sources and options. Each answer is
+written as soon as its query has been read, so another program can keep
+the lookup running and talk to it over a pipe.
+
+    echo "Exhilarating! What a Scoopl" | python run_lookup.py
+
+With --benchmark the matches are not printed; instead the throughput in
+queries per second is reported for a cold pass and for a warm pass served
+from the match cache, along with the cost of assembling one result (source
+and options of a matched event). If stdin is a terminal the benchmark uses
+every event name in the databases as queries.
+"""
+
+import argparse
+import json
+import queue
+import sys
+import os
+import threading
+import time
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core.event_database import EventDatabase
+
+
+def read_lines(stream, lines):
+    """Reader thread: put every line of the stream on a queue, then None at EOF."""
+    try:
+        for line in iter(stream.readline, ""):
+            lines.put(line.rstrip("\r\n"))
+    finally:
+        lines.put(None)
+
+
+def read_batches(stream, batch_size):
+    """
+    Yield the queries that have arrived, at most ``batch_size`` at a time.
+
+    Waits only for the first query of a batch, then adds whatever else is
+    already waiting, so a caller that sends one query and waits for its
+    answer gets it right away. Blank lines are queries too (with no
+    matches), which keeps the answers in step with the input lines.
+    """
+    lines = queue.Queue()
+    threading.Thread(target=read_lines, args=(stream, lines), daemon=True).start()
+    while True:
+        query = lines.get()
+        if query is None:
+            return
+        batch = [query]
+        while len(batch) < batch_size:
+            try:
+                query = lines.get_nowait()
+            except queue.Empty:
+                break
+            if query is None:
+                yield batch
+                return
+            batch.append(query)
+        yield batch
+
+
+def timed_pass(database, queries, batch_size):
+    started = time.perf_counter()
+    for start in range(0, len(queries), batch_size):
+        database.lookup_batch(queries[start:start + batch_size])
+    return time.perf_counter() - started
+
+
+def run_benchmark(database, queries, batch_size):
+    # The first pass fills the match cache, the second repeats the same reads like a title held on screen
+    timings = [("cold", timed_pass(database, queries, batch_size)), ("warm", timed_pass(database, queries, batch_size))]
+    for name, elapsed in timings:
+        qps = len(queries) / elapsed if elapsed else 0.0
+        print(f"{name}: {len(queries)} queries in {elapsed:.3f}s ({qps:.0f} queries/s, batch size {batch_size})")
+    cold, warm = timings[0][1], timings[1][1]
+    if queries and warm:
+        print(f"warm speedup: {cold / warm:.1f}x")
+    (find_hits, find_misses), (normalize_hits, normalize_misses) = database.event_index.cache_summary()
+    print(f"match cache: {find_hits} hits, {find_misses} misses; "
+          f"normalize cache: {normalize_hits} hits, {normalize_misses} misses")
+
+    # Building a result for an already matched name: the per-lookup cost left after the search itself
+    matches = [[(event_name, 1.0)] for event_name in database.event_index.name_ids]
+    # The first pass builds each event's shared options view
+    for match in matches:
+        database.event_index.resolve(match)
+    started = time.perf_counter()
+    for match in matches:
+        database.event_index.resolve(match)
+    elapsed = time.perf_counter() - started
+    per_result = elapsed / len(matches) * 1e6 if matches else 0.0
+    print(f"{len(matches)} results assembled in {elapsed * 1000:.1f}ms ({per_result:.2f} µs each)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Match OCR strings from stdin against the event databases.")
+    parser.add_argument("--limit", type=int, default=3, help="maximum matches per query")
+    parser.add_argument("--max-distance", type=float, help="edit distance budget (default scales with query length)")
+    parser.add_argument("--batch-size", type=int, default=64, help="most queries matched per batch")
+    parser.add_argument("--benchmark", action="store_true", help="report queries per second instead of matches")
+    args = parser.parse_args()
+
+    database = EventDatabase.load(verbose=False)
+
+    if args.benchmark:
+        if sys.stdin.isatty():
+            queries = list(database.event_index.name_ids)
+        else:
+            queries = [line.rstrip("\r\n") for line in sys.stdin if line.strip()]
+        run_benchmark(database, queries, args.batch_size)
+        return
+
+    for batch in read_batches(sys.stdin, args.batch_size):
+        for query, matches in zip(batch, database.lookup_batch(batch, args.max_distance, args.limit)):
+            sys.stdout.write(json.dumps({"query": query, "matches": matches}, ensure_ascii=False) + "\n")
+        sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
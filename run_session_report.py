@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Session Report
+Summarizes the session log the overlay writes: the support events seen in a
+run and the OCR reads that matched no event, most frequent first. Unmatched
+reads are the ones worth adding to the databases or fixing in the OCR.
+
+    python run_session_report.py            # latest run
+    python run_session_report.py --all      # unmatched reads across every run
+"""
+
+import argparse
+import sys
+import os
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core.session_log import SESSION_LOG_PATH, SessionLog
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize the overlay's session log.")
+    parser.add_argument("--log", default=SESSION_LOG_PATH, help=f"session log file (default {SESSION_LOG_PATH})")
+    parser.add_argument("--run", type=int, help="run id to report (default the latest)")
+    parser.add_argument("--all", action="store_true", help="count unmatched reads across every run")
+    parser.add_argument("--limit", type=int, default=20, help="unmatched reads to list")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.log):
+        print(f"❌ No session log at {args.log}")
+        return 1
+
+    session_log = SessionLog(args.log)
+    session_log.open(new_run=False)
+    try:
+        run_id = args.run or session_log.latest_run()
+        if run_id is None:
+            print(f"❌ No runs recorded in {args.log}")
+            return 1
+        detections, unmatched, latency = session_log.run_summary(run_id)
+        print(f"Run {run_id}: {detections} detections, {unmatched} unmatched"
+              + (f", {latency:.0f}ms mean capture-to-decision latency" if latency is not None else ""))
+
+        support_events = session_log.support_events(run_id=run_id)
+        print(f"\nƱ Support events ({len(support_events)}):")
+        for _, event_name, game_date in support_events:
+            print(f"   {event_name}" + (f"  ({game_date})" if game_date else ""))
+
+        unmatched_reads = session_log.unmatched_ocr(args.limit, None if args.all else run_id)
+        print(f"\n❓ Unmatched OCR reads{' (all runs)' if args.all else ''}:")
+        for ocr_text, seen in unmatched_reads:
+            print(f"   {seen:>4}  {ocr_text}")
+    finally:
+        session_log.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+import os
+import threading
+
+
+def file_state(path):
+    """
+    Return (mtime_ns, size) for a file, or None if it doesn't exist.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class FileWatcher:
+    """
+    Polls a few files from a background thread and reports the ones that changed.
+
+    A change is only reported once the file has looked the same for two polls
+    in a row, so a file that is still being written is never picked up half way.
+
+    Args:
+        paths: Files to watch.
+        on_change: Called from the watcher thread with the list of changed paths.
+        interval: Seconds between polls.
+    """
+
+    def __init__(self, paths, on_change, interval=2.0):
+        self.paths = list(paths)
+        self.on_change = on_change
+        self.interval = interval
+        self.states = {path: file_state(path) for path in self.paths}
+        self.pending = {}
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, name="file-watcher", daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout=1.0):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join(timeout)
+            self.thread = None
+
+    def poll(self):
+        """
+        Check every file once.
+
+        Return:
+            The paths whose change has settled since the last report.
+        """
+        changed = []
+        for path in self.paths:
+            state = file_state(path)
+            if state == self.states[path]:
+                self.pending.pop(path, None)
+            elif self.pending.get(path) == state:
+                # Same new state as the previous poll: the write has finished
+                del self.pending[path]
+                self.states[path] = state
+                changed.append(path)
+            else:
+                self.pending[path] = state
+        return changed
+
+    def run(self):
+        while not self.stop_event.wait(self.interval):
+            changed = self.poll()
+            if changed:
+                try:
+                    self.on_change(changed)
+                except Exception as e:
+                    print(f"[WARNING] File change handler failed: {e}")
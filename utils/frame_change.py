@@ -0,0 +1,59 @@
+import cv2
+import numpy as np
+
+
+class ChangeDetector:
+    """
+    Cheap per-region change detection based on downscaled block means.
+
+    Each region is reduced to a small grid of block averages. A region counts
+    as unchanged while every block stays within the tolerance of the last
+    signature that was reported as changed, so slow drifts still add up to a
+    change eventually.
+
+    Args:
+        grid: (width, height) of the signature grid.
+        tolerance: Largest per-block difference, in gray levels, treated as noise.
+    """
+
+    def __init__(self, grid=(32, 32), tolerance=2.0):
+        self.grid = grid
+        self.tolerance = tolerance
+        self.signatures = {}
+        self.checks = {}
+        self.skips = {}
+
+    def signature(self, image):
+        """Return the block-mean signature of an image."""
+        return cv2.resize(image, self.grid, interpolation=cv2.INTER_AREA).astype(np.int16)
+
+    def changed(self, name, image):
+        """
+        Check whether a region differs from its last changed signature.
+
+        Args:
+            name: The region name.
+            image: The region's pixels in any colour format, as long as it is consistent between calls.
+
+        Return:
+            True if the region changed (or is seen for the first time), False otherwise.
+        """
+        signature = self.signature(image)
+        previous = self.signatures.get(name)
+        self.checks[name] = self.checks.get(name, 0) + 1
+        if previous is not None and previous.shape == signature.shape and np.abs(signature - previous).max() <= self.tolerance:
+            self.skips[name] = self.skips.get(name, 0) + 1
+            return False
+        self.signatures[name] = signature
+        return True
+
+    def reset(self, name=None):
+        """Forget the stored signature of one region, or of all regions."""
+        if name is None:
+            self.signatures.clear()
+        else:
+            self.signatures.pop(name, None)
+
+    def summary(self):
+        """Return {name: (skipped, checked)} for every region seen so far."""
+        return {name: (self.skips.get(name, 0), checks) for name, checks in self.checks.items()}
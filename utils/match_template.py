@@ -47,3 +47,119 @@ def is_match_template(image, template, method=cv2.TM_CCOEFF_NORMED, threshold=0.
 
     # Check if any matches found
     return max_val >= threshold
+
+
+class TemplateDetector:
+    """
+    Template matcher for a fixed template, tuned for repeated calls on live frames.
+
+    The template is converted to grayscale once. Each call first searches a
+    small ROI around the previous hit, then falls back to a coarse match on a
+    downscaled image and refines at full resolution around the coarse peak.
+
+    Args:
+        template: The template image to search for.
+        threshold: Minimum score for a match.
+        method: The method to use for template matching (a normalized TM_*_NORMED method).
+        scale: Downscale factor for the coarse pass; 1.0 disables it.
+        roi_margin: Pixels searched around the last hit before a full search.
+        coarse_margin: Score below the threshold at which a coarse peak is still refined.
+    """
+
+    def __init__(self, template, threshold=0.85, method=cv2.TM_CCOEFF_NORMED, scale=0.5, roi_margin=16, coarse_margin=0.25):
+        if not isinstance(template, np.ndarray):
+            template = np.array(template)
+        self.template = to_grayscale(template)
+        self.threshold = threshold
+        self.method = method
+        self.roi_margin = roi_margin
+        self.coarse_margin = coarse_margin
+        self.last_location = None
+
+        height, width = self.template.shape[:2]
+        # Skip the coarse pass when the downscaled template would be too small to be distinctive
+        self.scale = scale if min(height, width) * scale >= 8 else 1.0
+        if self.scale < 1.0:
+            self.small_template = cv2.resize(self.template, None, fx=self.scale, fy=self.scale, interpolation=cv2.INTER_AREA)
+        else:
+            self.small_template = None
+
+    def _match_in(self, image_gray, left, top, right, bottom):
+        """Best match whose top-left corner lies within [left, right) x [top, bottom)."""
+        height, width = self.template.shape[:2]
+        image_height, image_width = image_gray.shape[:2]
+        left, top = max(0, left), max(0, top)
+        right = min(image_width - width + 1, right)
+        bottom = min(image_height - height + 1, bottom)
+        if right <= left or bottom <= top:
+            return None, -1.0
+        roi = image_gray[top:bottom + height - 1, left:right + width - 1]
+        result = cv2.matchTemplate(roi, self.template, self.method)
+        _, max_val, _, max_loc = cv2.minMaxLoc(result)
+        return (left + max_loc[0], top + max_loc[1]), max_val
+
+    def detect(self, image):
+        """
+        Search for the template in an image.
+
+        Args:
+            image: The larger image to search within (BGR or grayscale).
+
+        Return:
+            (location, score): the top-left (x, y) of the match, or None if the
+            best score is below the threshold, and the best score found.
+        """
+        if not isinstance(image, np.ndarray):
+            image = np.array(image)
+        image_gray = to_grayscale(image)
+        height, width = self.template.shape[:2]
+        if image_gray.shape[0] < height or image_gray.shape[1] < width:
+            return None, -1.0
+
+        # Where the icon was last time is the most likely place to find it again
+        if self.last_location is not None:
+            x, y = self.last_location
+            location, score = self._match_in(image_gray, x - self.roi_margin, y - self.roi_margin,
+                                             x + self.roi_margin + 1, y + self.roi_margin + 1)
+            if score >= self.threshold:
+                self.last_location = location
+                return location, score
+
+        if self.small_template is not None:
+            small_image = cv2.resize(image_gray, None, fx=self.scale, fy=self.scale, interpolation=cv2.INTER_AREA)
+            result = cv2.matchTemplate(small_image, self.small_template, self.method)
+            _, coarse_score, _, coarse_loc = cv2.minMaxLoc(result)
+            if coarse_score < self.threshold - self.coarse_margin:
+                self.last_location = None
+                return None, coarse_score
+            # Refine at full resolution around the coarse peak
+            radius = int(np.ceil(1 / self.scale)) + 1
+            x, y = int(coarse_loc[0] / self.scale), int(coarse_loc[1] / self.scale)
+            location, score = self._match_in(image_gray, x - radius, y - radius, x + radius + 1, y + radius + 1)
+        else:
+            location, score = self._match_in(image_gray, 0, 0, image_gray.shape[1], image_gray.shape[0])
+
+        if score >= self.threshold:
+            self.last_location = location
+            return location, score
+        self.last_location = None
+        return None, score
+
+    def detect_near(self, image, location, margin):
+        """
+        Search for the template only around a given location, e.g. for repeats of an icon.
+
+        Args:
+            image: The larger image to search within (BGR or grayscale).
+            location: The expected top-left (x, y) of the match.
+            margin: Pixels searched around ``location`` in every direction.
+
+        Return:
+            (location, score) like ``detect``; the last hit used by ``detect`` is left alone.
+        """
+        image_gray = to_grayscale(np.asarray(image))
+        x, y = location
+        location, score = self._match_in(image_gray, x - margin, y - margin, x + margin + 1, y + margin + 1)
+        if score >= self.threshold:
+            return location, score
+        return None, score
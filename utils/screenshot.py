@@ -1,4 +1,5 @@
 from PIL import Image
+import cv2
 import mss
 import numpy as np
 
@@ -13,4 +14,86 @@ def capture_region(region=(0, 0, 1920, 1080)) -> Image.Image:
         img = sct.grab(monitor)
         img_np = np.array(img)
         img_rgb = img_np[:, :, :3][:, :, ::-1]
-        return Image.fromarray(img_rgb)
\ No newline at end of file
+        return Image.fromarray(img_rgb)
+
+
+def primary_monitor_bounds():
+    """
+    Return the primary monitor as (left, top, width, height) in screen coordinates.
+    """
+    with mss.mss() as sct:
+        monitor = sct.monitors[1] if len(sct.monitors) > 1 else sct.monitors[0]
+        return monitor["left"], monitor["top"], monitor["width"], monitor["height"]
+
+
+class CapturedFrame:
+    """
+    One screen grab covering several named regions.
+
+    Args:
+        bgra: The grabbed pixels as an (height, width, 4) BGRA array.
+        origin: Screen coordinates (x, y) of the array's top-left pixel.
+        regions: Mapping of region name to (x, y, width, height) in screen coordinates.
+    """
+
+    def __init__(self, bgra, origin, regions):
+        self.bgra = bgra
+        self.origin = origin
+        self.regions = regions
+
+    def view(self, name, color="bgr"):
+        """
+        Return the pixels of a named region.
+
+        Args:
+            name: The region name.
+            color: "bgra", "bgr" and "rgb" return views into the grab without
+                copying; "gray" converts to a new single-channel array.
+        """
+        x, y, width, height = self.regions[name]
+        left = x - self.origin[0]
+        top = y - self.origin[1]
+        pixels = self.bgra[top:top + height, left:left + width]
+        if color == "bgra":
+            return pixels
+        if color == "bgr":
+            return pixels[:, :, :3]
+        if color == "rgb":
+            return pixels[:, :, 2::-1]
+        if color == "gray":
+            return cv2.cvtColor(pixels, cv2.COLOR_BGRA2GRAY)
+        raise ValueError(f"Unknown color format: {color}")
+
+
+class CaptureSession:
+    """
+    Persistent screen capture that grabs every named region with a single call.
+
+    The mss handle is created lazily and reused, so a session must stay on the
+    thread that first calls grab().
+
+    Args:
+        regions: Mapping of region name to (x, y, width, height).
+    """
+
+    def __init__(self, regions):
+        self.regions = dict(regions)
+        self.sct = None
+        left = min(x for x, _, _, _ in self.regions.values())
+        top = min(y for _, y, _, _ in self.regions.values())
+        right = max(x + width for x, _, width, _ in self.regions.values())
+        bottom = max(y + height for _, y, _, height in self.regions.values())
+        self.monitor = {"left": left, "top": top, "width": right - left, "height": bottom - top}
+
+    def grab(self) -> CapturedFrame:
+        """Grab the bounding box of all regions once."""
+        if self.sct is None:
+            self.sct = mss.mss()
+        img = self.sct.grab(self.monitor)
+        bgra = np.frombuffer(img.raw, dtype=np.uint8).reshape(img.height, img.width, 4)
+        return CapturedFrame(bgra, (self.monitor["left"], self.monitor["top"]), self.regions)
+
+    def close(self):
+        if self.sct is not None:
+            self.sct.close()
+            self.sct = None